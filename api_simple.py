@@ -3,13 +3,33 @@ Event Recommendation API
 Simple interface for getting event recommendations
 """
 
-import pandas as pd
 from recommendation_system import EventRecommendationSystem
+from feedback_store import get_feedback_store
+from cohort_table import CohortMeanTable
+from event_stats import EventStatsTable
 
 class EventRecommendationAPI:
-    def __init__(self):
-        self.recommender = EventRecommendationSystem()
-        self.df = pd.read_csv('event_feedback_dataset.csv')
+    def __init__(self, store=None, recommender=None):
+        """
+        Args:
+            store: shared FeedbackStore (defaults to the process-wide store)
+            recommender: an existing EventRecommendationSystem to reuse
+        """
+        self.recommender = recommender if recommender is not None else EventRecommendationSystem()
+        self.store = store if store is not None else get_feedback_store()
+        
+        # Mean past ratings per cohort, backing off to broader cohorts when one is sparse.
+        # Tables subscribe before loading the data, so no appended batch is missed.
+        self.cohort_table = CohortMeanTable()
+        self.cohort_table.add_batch(self.store.subscribe(self.cohort_table.add_batch))
+        
+        # Per-event summary statistics, refreshed for the events new feedback touches
+        self.event_stats = EventStatsTable()
+        self.event_stats.add_batch(self.store.subscribe(self.event_stats.add_batch))
+    
+    @property
+    def df(self):
+        return self.store.df
         
     def get_recommendations(self, student_profile, event_list=None, top_n=5):
         """
@@ -48,28 +68,10 @@ class EventRecommendationAPI:
                 {'name': 'Convocation', 'type': 'Ceremony', 'level': 'University', 'duration_days': 1},
             ]
         
-        # Find similar students to get better predictions
-        similar_students = self.df[
-            (self.df['student_branch'] == student_profile['branch']) &
-            (self.df['student_year'] == student_profile['year']) &
-            (self.df['skill_level'] == student_profile['skill_level'])
-        ]
-        
-        past_feedback = None
-        if len(similar_students) > 0:
-            past_feedback = {
-                'venue_rating': similar_students['venue_rating'].mean(),
-                'organization_rating': similar_students['organization_rating'].mean(),
-                'content_quality': similar_students['content_quality'].mean(),
-                'mentor_support': similar_students['mentor_support'].mean(),
-                'food_quality': similar_students['food_quality'].mean(),
-                'prize_satisfaction': similar_students['prize_satisfaction'].mean(),
-                'networking_opportunities': similar_students['networking_opportunities'].mean(),
-                'time_management': similar_students['time_management'].mean(),
-                'infrastructure': similar_students['infrastructure'].mean(),
-                'registration_process': similar_students['registration_process'].mean(),
-                'learning_outcome': similar_students['learning_outcome'].mean(),
-            }
+        # Mean past ratings of similar students give better predictions
+        past_feedback = self.cohort_table.past_feedback(
+            student_profile['branch'], student_profile['year'], student_profile['skill_level']
+        )
         
         recommendations = self.recommender.recommend_events_for_student(
             student_profile, 
@@ -99,48 +101,16 @@ class EventRecommendationAPI:
         if 'achievement' not in student_profile:
             student_profile['achievement'] = 'Participation'
             
-        # Find similar students
-        similar_students = self.df[
-            (self.df['student_branch'] == student_profile['branch']) &
-            (self.df['student_year'] == student_profile['year']) &
-            (self.df['skill_level'] == student_profile['skill_level'])
-        ]
-        
-        past_feedback = None
-        if len(similar_students) > 0:
-            past_feedback = {
-                'venue_rating': similar_students['venue_rating'].mean(),
-                'organization_rating': similar_students['organization_rating'].mean(),
-                'content_quality': similar_students['content_quality'].mean(),
-                'mentor_support': similar_students['mentor_support'].mean(),
-                'food_quality': similar_students['food_quality'].mean(),
-                'prize_satisfaction': similar_students['prize_satisfaction'].mean(),
-                'networking_opportunities': similar_students['networking_opportunities'].mean(),
-                'time_management': similar_students['time_management'].mean(),
-                'infrastructure': similar_students['infrastructure'].mean(),
-                'registration_process': similar_students['registration_process'].mean(),
-                'learning_outcome': similar_students['learning_outcome'].mean(),
-            }
+        # Mean past ratings of similar students
+        past_feedback = self.cohort_table.past_feedback(
+            student_profile['branch'], student_profile['year'], student_profile['skill_level']
+        )
         
         return self.recommender.predict_recommendation(student_profile, event_info, past_feedback)
     
     def get_event_statistics(self, event_name):
         """Get statistics for a specific event"""
-        event_data = self.df[self.df['event_name'] == event_name]
-        
-        if len(event_data) == 0:
-            return None
-            
-        return {
-            'event_name': event_name,
-            'total_feedback': len(event_data),
-            'avg_satisfaction': event_data['overall_satisfaction'].mean(),
-            'recommendation_rate': event_data['would_recommend'].mean(),
-            'avg_organization': event_data['organization_rating'].mean(),
-            'avg_content_quality': event_data['content_quality'].mean(),
-            'avg_learning_outcome': event_data['learning_outcome'].mean(),
-            'common_issues': event_data['issues_faced'].mode().values[0] if len(event_data) > 0 else 'None'
-        }
+        return self.event_stats.get(event_name)
 
 
 # Example Usage
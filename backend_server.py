@@ -3,19 +3,41 @@ Campus Memory + ML Integration Backend
 FastAPI server that combines the ML models with the Campus Memory platform
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Depends, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+from typing import List, Optional, Dict, Any, Union, Literal
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import json
 import os
+import copy
+import re
+import csv
+import io
+import hashlib
+import functools
+import threading
+import multiprocessing
 
 # Import ML systems
 from recommendation_system import EventRecommendationSystem
 from event_guidance_system import EventGuidanceSystem
+from feedback_store import get_feedback_store
+from inference_executor import InferenceExecutor, ExecutorSaturated
+from micro_batcher import MicroBatcher
+from campus_store import open_campus_store
+from campus_shards import open_sharded_campus_store, worker_for_shard
+from campus_analytics import CountingCampusStore
+from campus_search import SearchableCampusStore, SEARCH_FIELDS
+from campus_pubsub import CampusBroker, RESYNC, format_sse
+from event_registry import EventRegistry, EventFullError
+from guidance_jobs import GuidanceJobs
+from record_ids import new_id
 
 app = FastAPI(
     title="Campus Memory ML API",
@@ -23,6 +45,43 @@ app = FastAPI(
     version="1.0.0"
 )
 
+class CollegeAffinityMiddleware:
+    """
+    Tag /api/colleges/{college_id}/... responses with the college's shard, and when
+    several workers split the shards, answer 421 (with the owning worker) for colleges
+    this worker doesn't own, so in-process state (counters, search index, streams)
+    only ever sees one writer per college. Pure ASGI, so streamed responses pass through.
+    """
+
+    COLLEGE_PATH = re.compile(r"^/api/colleges/([^/]+)/")
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        match = self.COLLEGE_PATH.match(scope.get("path", "")) if scope["type"] == "http" else None
+        if match is None or CAMPUS_SHARDS == 1:
+            return await self.app(scope, receive, send)
+
+        shard = campus_base_store.shard_for(match.group(1))
+        owner = worker_for_shard(shard, CAMPUS_WORKER_COUNT)
+        headers = {"X-Campus-Shard": str(shard), "X-Campus-Worker": str(owner)}
+        if owner != CAMPUS_WORKER_INDEX:
+            # 421 Misdirected Request: the proxy should send this college to its owning worker
+            response = JSONResponse({"detail": f"College is served by worker {owner}"}, status_code=421, headers=headers)
+            return await response(scope, receive, send)
+
+        shard_headers = [(k.lower().encode(), v.encode()) for k, v in headers.items()]
+
+        async def send_with_shard(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + shard_headers
+            await send(message)
+        await self.app(scope, receive, send_with_shard)
+
+# Added before CORS so CORS wraps it: 421 answers need CORS headers for browsers to read them
+app.add_middleware(CollegeAffinityMiddleware)
+
 # CORS middleware for Next.js frontend
 app.add_middleware(
     CORSMiddleware,
@@ -30,18 +89,76 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Campus-Shard", "X-Campus-Worker"],
 )
 
-# Initialize ML systems
+# Initialize ML systems (one shared copy of the feedback data for every component)
 try:
+    feedback_store = get_feedback_store()
     recommender = EventRecommendationSystem()
-    guidance_system = EventGuidanceSystem()
+    guidance_system = EventGuidanceSystem(store=feedback_store)
     print("✅ ML Models loaded successfully!")
 except Exception as e:
     print(f"⚠️  Warning: Could not load ML models: {e}")
+    feedback_store = None
     recommender = None
     guidance_system = None
 
+# Optional worker processes for model scoring (0 = score in this process)
+ML_PROCESS_WORKERS = int(os.environ.get("ML_PROCESS_WORKERS", 0))
+# Only the top-level server builds a pool; spawned workers may re-import this module
+if recommender is not None and ML_PROCESS_WORKERS > 0 and multiprocessing.parent_process() is None:
+    try:
+        pool = recommender.enable_process_pool(ML_PROCESS_WORKERS)
+        print(f"✅ Inference pool started: {pool.workers} workers, "
+              f"{pool.model_bytes / 1e6:.0f} MB of shared model arrays")
+    except ValueError as e:
+        print(f"⚠️  Warning: Scoring in-process, inference pool unavailable: {e}")
+
+# Dedicated pool for model inference so CPU-heavy ML calls can't starve the CRUD routes
+ML_WORKERS = int(os.environ.get("ML_WORKERS", max(min(4, os.cpu_count() or 1), ML_PROCESS_WORKERS)))
+ML_QUEUE_DEPTH = int(os.environ.get("ML_QUEUE_DEPTH", 32))
+ML_RETRY_AFTER_SECONDS = int(os.environ.get("ML_RETRY_AFTER_SECONDS", 1))
+inference_executor = InferenceExecutor(max_workers=ML_WORKERS, max_queue=ML_QUEUE_DEPTH)
+
+async def run_inference(fn, *args, **kwargs):
+    """Run ML work on the inference pool; 503 with Retry-After when the pool is saturated"""
+    try:
+        return await inference_executor.run(fn, *args, **kwargs)
+    except ExecutorSaturated:
+        raise HTTPException(
+            status_code=503,
+            detail="ML inference queue is full, please retry shortly",
+            headers={"Retry-After": str(ML_RETRY_AFTER_SECONDS)}
+        )
+
+# Concurrent recommend-events calls are coalesced into one model call per batch
+ML_BATCH_MAX_SIZE = int(os.environ.get("ML_BATCH_MAX_SIZE", 64))
+ML_BATCH_MAX_WAIT_MS = float(os.environ.get("ML_BATCH_MAX_WAIT_MS", 5))
+
+def recommend_batch(items):
+    """items: (student_profile, event_list, past_feedback, top_n) tuples"""
+    return recommender.recommend_events_for_students(items)
+
+recommend_batcher = MicroBatcher(
+    recommend_batch,
+    max_batch_size=ML_BATCH_MAX_SIZE,
+    max_wait_ms=ML_BATCH_MAX_WAIT_MS,
+    run=run_inference
+)
+
+# Events scored by /api/ml/recommend-events
+DEFAULT_EVENT_LIST = [
+    {'name': 'Hacksetu', 'type': 'Hackathon', 'level': 'National', 'duration_days': 2},
+    {'name': 'Anveshan', 'type': 'Hackathon', 'level': 'University', 'duration_days': 1},
+    {'name': 'Ami Chroma', 'type': 'Cultural', 'level': 'University', 'duration_days': 3},
+    {'name': 'Smart India Hackathon', 'type': 'Hackathon', 'level': 'National', 'duration_days': 3},
+    {'name': 'Init Maths', 'type': 'Training', 'level': 'Department', 'duration_days': 6},
+    {'name': 'Convocation', 'type': 'Ceremony', 'level': 'University', 'duration_days': 1},
+    {'name': 'Tech Fest', 'type': 'Technical', 'level': 'University', 'duration_days': 2},
+    {'name': 'Code Sprint', 'type': 'Hackathon', 'level': 'Department', 'duration_days': 1},
+]
+
 # Pydantic models for request/response
 class StudentProfile(BaseModel):
     branch: str
@@ -62,6 +179,49 @@ class EventInfo(BaseModel):
     description: Optional[str] = ""
     date: Optional[str] = ""
 
+class GuidanceRequest(BaseModel):
+    student: StudentProfile
+    event_name: str
+
+class BatchGuidanceRequest(BaseModel):
+    items: List[GuidanceRequest]
+
+class FeedbackRecord(BaseModel):
+    event_name: str
+    event_type: str
+    event_duration_days: int
+    overall_satisfaction: float
+    would_recommend: int
+    event_level: Optional[str] = None
+    event_date: Optional[str] = None
+    student_id: Optional[str] = None
+    student_branch: Optional[str] = None
+    student_year: Optional[int] = None
+    student_age: Optional[int] = None
+    gender: Optional[str] = None
+    previous_participation: Optional[str] = None
+    skill_level: Optional[str] = None
+    team_size: Optional[int] = None
+    participated_alone: Optional[int] = None
+    achievement: Optional[str] = None
+    venue_rating: Optional[float] = None
+    organization_rating: Optional[float] = None
+    content_quality: Optional[float] = None
+    mentor_support: Optional[float] = None
+    food_quality: Optional[float] = None
+    prize_satisfaction: Optional[float] = None
+    networking_opportunities: Optional[float] = None
+    time_management: Optional[float] = None
+    infrastructure: Optional[float] = None
+    registration_process: Optional[float] = None
+    learning_outcome: Optional[float] = None
+    attend_similar_event: Optional[float] = None
+    sentiment: Optional[str] = None
+    feedback_length: Optional[int] = None
+    issues_faced: Optional[str] = None
+    suggestions_given: Optional[int] = None
+    feedback_submitted_date: Optional[str] = None
+
 class Problem(BaseModel):
     id: Optional[str] = None
     title: str
@@ -97,21 +257,84 @@ class Alert(BaseModel):
     createdBy: str
     confidence: Optional[float] = 0.85
 
-# In-memory storage (replace with database in production)
+# Campus data storage: problems / wisdom / alerts live in the campus store (SQLite by default),
+# events still use a JSON file
 DATA_DIR = "campus_data"
 os.makedirs(DATA_DIR, exist_ok=True)
+# CAMPUS_SHARDS > 1 splits colleges over that many independent stores (campus_data/shards/)
+CAMPUS_SHARDS = int(os.environ.get("CAMPUS_SHARDS", 1))
+# With several server processes, worker i of n serves only the colleges on shards i, i+n, ...
+CAMPUS_WORKER_COUNT = int(os.environ.get("CAMPUS_WORKER_COUNT", 1))
+CAMPUS_WORKER_INDEX = int(os.environ.get("CAMPUS_WORKER_INDEX", 0))
+if CAMPUS_SHARDS > 1:
+    campus_base_store = open_sharded_campus_store(DATA_DIR, CAMPUS_SHARDS)
+else:
+    campus_base_store = open_campus_store(DATA_DIR)
+campus_store = SearchableCampusStore(CountingCampusStore(campus_base_store))
+event_registry = EventRegistry(os.path.join(DATA_DIR, "campus.db"))
+
+# Post-registration guidance computed off the request path when ?background=true
+GUIDANCE_WORKERS = int(os.environ.get("GUIDANCE_WORKERS", 1))
+GUIDANCE_QUEUE_DEPTH = int(os.environ.get("GUIDANCE_QUEUE_DEPTH", 256))
+guidance_jobs = GuidanceJobs(
+    os.path.join(DATA_DIR, "campus.db"), workers=GUIDANCE_WORKERS, max_queue=GUIDANCE_QUEUE_DEPTH
+)
+
+# Live feed of created problems / wisdom / alerts for the per-college SSE stream
+STREAM_QUEUE_SIZE = int(os.environ.get("STREAM_QUEUE_SIZE", 100))
+STREAM_HEARTBEAT_SECONDS = float(os.environ.get("STREAM_HEARTBEAT_SECONDS", 15))
+campus_broker = CampusBroker(max_queue=STREAM_QUEUE_SIZE)
+
+# Parsed JSON files keyed by filename, revalidated by (mtime, size) so unchanged files aren't re-read
+_json_cache = {}
+_json_cache_lock = threading.Lock()
+
+def _file_stamp(filepath):
+    try:
+        stat = os.stat(filepath)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
 
 def load_json(filename, default=None):
     filepath = os.path.join(DATA_DIR, filename)
-    if os.path.exists(filepath):
-        with open(filepath, 'r') as f:
-            return json.load(f)
-    return default if default is not None else []
+    stamp = _file_stamp(filepath)
+    if stamp is None:
+        return default if default is not None else []
+    
+    with _json_cache_lock:
+        cached = _json_cache.get(filename)
+        if cached is None or cached[0] != stamp:
+            with open(filepath, 'r') as f:
+                cached = (stamp, json.load(f))
+            _json_cache[filename] = cached
+        # Callers may modify what they get back, so hand out a copy
+        return copy.deepcopy(cached[1])
 
 def save_json(filename, data):
     filepath = os.path.join(DATA_DIR, filename)
-    with open(filepath, 'w') as f:
-        json.dump(data, f, indent=2)
+    with _json_cache_lock:
+        with open(filepath, 'w') as f:
+            json.dump(data, f, indent=2)
+        _json_cache[filename] = (_file_stamp(filepath), copy.deepcopy(data))
+
+def conditional_json(request: Request, version, build):
+    """
+    JSON response with an ETag derived from version; 304 when the client already has it
+
+    version must change whenever build() would return something different, so
+    a matching If-None-Match is answered without loading or serializing anything.
+    """
+    digest = hashlib.blake2b(repr((version, request.url.query)).encode(), digest_size=12).hexdigest()
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Weak comparison (RFC 9110): W/ prefixes are ignored, * matches anything
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+    return JSONResponse(build(), headers=headers)
 
 # ==================== Health Check ====================
 @app.get("/")
@@ -130,34 +353,24 @@ def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "models_loaded": recommender is not None and guidance_system is not None
+        "models_loaded": recommender is not None and guidance_system is not None,
+        "inference": inference_executor.stats(),
+        "campus_store": campus_store.stats() if hasattr(campus_store, "stats") else {"backend": campus_store.backend},
+        "stream": campus_broker.stats(),
+        "guidance_jobs": guidance_jobs.stats()
     }
 
 # ==================== ML Endpoints ====================
 @app.post("/api/ml/recommend-events")
-def recommend_events(student: StudentProfile, top_n: int = 5):
+async def recommend_events(student: StudentProfile, top_n: int = 5):
     """Get personalized event recommendations for a student"""
     if recommender is None:
         raise HTTPException(status_code=503, detail="ML model not available")
     
     try:
-        # Default event list
-        event_list = [
-            {'name': 'Hacksetu', 'type': 'Hackathon', 'level': 'National', 'duration_days': 2},
-            {'name': 'Anveshan', 'type': 'Hackathon', 'level': 'University', 'duration_days': 1},
-            {'name': 'Ami Chroma', 'type': 'Cultural', 'level': 'University', 'duration_days': 3},
-            {'name': 'Smart India Hackathon', 'type': 'Hackathon', 'level': 'National', 'duration_days': 3},
-            {'name': 'Init Maths', 'type': 'Training', 'level': 'Department', 'duration_days': 6},
-            {'name': 'Convocation', 'type': 'Ceremony', 'level': 'University', 'duration_days': 1},
-            {'name': 'TechFest', 'type': 'Technical', 'level': 'University', 'duration_days': 2},
-            {'name': 'Code Sprint', 'type': 'Hackathon', 'level': 'Department', 'duration_days': 1},
-        ]
-        
         student_dict = student.dict()
-        recommendations = recommender.recommend_events_for_student(
-            student_dict, 
-            event_list, 
-            top_n=top_n
+        recommendations = await recommend_batcher.submit(
+            (student_dict, DEFAULT_EVENT_LIST, None, top_n)
         )
         
         return {
@@ -166,18 +379,21 @@ def recommend_events(student: StudentProfile, top_n: int = 5):
             "recommendations": recommendations,
             "total_events": len(recommendations)
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating recommendations: {str(e)}")
 
 @app.post("/api/ml/event-guidance")
-def event_guidance(student: StudentProfile, event_name: str):
+async def event_guidance(student: StudentProfile, event_name: str):
     """Get comprehensive guidance for an event registration"""
     if guidance_system is None:
         raise HTTPException(status_code=503, detail="Guidance system not available")
     
     try:
         student_dict = student.dict()
-        guidance = guidance_system.get_recommendations_for_registered_event(
+        guidance = await run_inference(
+            guidance_system.get_recommendations_for_registered_event,
             student_dict, 
             event_name
         )
@@ -187,11 +403,38 @@ def event_guidance(student: StudentProfile, event_name: str):
             "event_name": event_name,
             "guidance": guidance
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating guidance: {str(e)}")
+
+@app.post("/api/ml/event-guidance/batch")
+async def event_guidance_batch(batch: BatchGuidanceRequest):
+    """Get guidance for several (student, event) pairs in one call"""
+    if guidance_system is None:
+        raise HTTPException(status_code=503, detail="Guidance system not available")
+    
+    try:
+        guidance_list = await run_inference(
+            guidance_system.get_guidance_batch,
+            [(item.student.dict(), item.event_name) for item in batch.items]
+        )
+        
+        return {
+            "status": "success",
+            "results": [
+                {"event_name": item.event_name, "guidance": guidance}
+                for item, guidance in zip(batch.items, guidance_list)
+            ],
+            "total": len(guidance_list)
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating guidance: {str(e)}")
 
 @app.post("/api/ml/predict-event-outcome")
-def predict_event_outcome(student: StudentProfile, event: EventInfo):
+async def predict_event_outcome(student: StudentProfile, event: EventInfo):
     """Predict likely satisfaction and recommendation for a specific event"""
     if recommender is None:
         raise HTTPException(status_code=503, detail="ML model not available")
@@ -200,222 +443,562 @@ def predict_event_outcome(student: StudentProfile, event: EventInfo):
         student_dict = student.dict()
         event_dict = event.dict()
         
-        prediction = recommender.predict_for_event(student_dict, event_dict)
+        prediction = await run_inference(recommender.predict_for_event, student_dict, event_dict)
         
         return {
             "status": "success",
             "prediction": prediction
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error predicting outcome: {str(e)}")
 
-# ==================== Campus Data Endpoints ====================
-@app.get("/api/colleges/{college_id}/problems")
-def get_problems(college_id: str, category: Optional[str] = None):
-    """Get all problems for a college"""
-    problems = load_json(f"problems_{college_id}.json", [])
+@app.post("/api/ml/feedback")
+async def ingest_feedback(feedback: Union[FeedbackRecord, List[FeedbackRecord]]):
+    """Add new feedback records; guidance reflects them immediately"""
+    if guidance_system is None:
+        raise HTTPException(status_code=503, detail="Guidance system not available")
+    
+    records = feedback if isinstance(feedback, list) else [feedback]
+    try:
+        added = await run_inference(guidance_system.add_feedback, [r.dict() for r in records])
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    return {"status": "success", "added": added, "total_records": len(feedback_store)}
+
+@app.get("/api/ml/store-stats")
+async def store_stats():
+    """Memory footprint of the shared feedback data store"""
+    if feedback_store is None:
+        raise HTTPException(status_code=503, detail="Feedback store not available")
+    
+    return {"status": "success", "stats": await run_inference(feedback_store.stats)}
+
+@app.get("/api/ml/feedback/export")
+def export_feedback(format: Literal["ndjson", "csv"] = "ndjson"):
+    """Stream the whole feedback dataset, one slice of rows at a time"""
+    if feedback_store is None:
+        raise HTTPException(status_code=503, detail="Feedback store not available")
+    
+    def rows():
+        for i, batch in enumerate(feedback_store.iter_batches()):
+            if format == "csv":
+                yield batch.to_csv(index=False, header=(i == 0))
+            else:
+                # Newer pandas end the chunk with a newline and older ones don't; emit exactly one
+                yield batch.to_json(orient="records", lines=True, date_format="iso").rstrip("\n") + "\n"
+    
+    return export_response(rows(), format, "event_feedback")
+
+@app.get("/api/ml/executor-stats")
+def executor_stats():
+    """Occupancy of the ML inference pool and recommend-events batching"""
+    return {
+        "status": "success",
+        "stats": inference_executor.stats(),
+        "recommend_batching": recommend_batcher.stats(),
+        "process_pool": (
+            recommender.inference_pool.stats()
+            if recommender is not None and recommender.inference_pool is not None else None
+        )
+    }
+
+# ==================== Bulk Campus Data Endpoints ====================
+# Registered before the /{collection}/{id} routes so "bulk" is never taken for a record id
+BULK_MAX_ITEMS = int(os.environ.get("BULK_MAX_ITEMS", 10000))
+# Collection -> (model, id prefix, field stamped with today's date on create), as in the single-item routes
+BULK_MODELS = {"problems": (Problem, "p", "reportedDate"), "wisdom": (WisdomTip, "w", "date"), "alerts": (Alert, "a", None)}
+
+async def read_bulk_items(request: Request):
+    """
+    Items of a bulk request: a JSON array, or NDJSON (one object per line) when the
+    Content-Type is application/x-ndjson. An NDJSON line that isn't valid JSON becomes
+    an error for that item only.
+    """
+    body = await request.body()
+    if request.headers.get("content-type", "").split(";")[0].strip() in ("application/x-ndjson", "application/jsonl"):
+        items = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                items.append(ValueError(f"Invalid JSON: {e}"))
+    else:
+        try:
+            items = json.loads(body or b"[]")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of items")
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per bulk request")
+    return items
+
+def validate_bulk_items(model, items):
+    """One validation pass: (index, validated item) pairs and per-item results for the invalid ones"""
+    valid, invalid = [], []
+    for index, item in enumerate(items):
+        if isinstance(item, Exception):
+            invalid.append({"index": index, "status": "invalid", "errors": [{"msg": str(item)}]})
+            continue
+        if not isinstance(item, dict):
+            invalid.append({"index": index, "status": "invalid", "errors": [{"msg": "Expected a JSON object"}]})
+            continue
+        try:
+            valid.append((index, model(**item)))
+        except ValidationError as e:
+            invalid.append({"index": index, "status": "invalid", "errors": jsonable_encoder(e.errors())})
+    return valid, invalid
+
+def bulk_response(results, all_or_nothing, written):
+    results.sort(key=lambda r: r["index"])
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    body = {"status": "success", "written": written, "counts": counts, "results": results}
+    if all_or_nothing and counts.get("invalid"):
+        body["status"] = "error"
+        return JSONResponse(body, status_code=422)
+    return body
+
+@app.post("/api/colleges/{college_id}/{collection}/bulk")
+async def bulk_create(
+    college_id: str,
+    collection: Literal["problems", "wisdom", "alerts"],
+    request: Request,
+    all_or_nothing: bool = Query(False, description="Write nothing if any item is invalid")
+):
+    """Create many problems / wisdom tips / alerts in one storage transaction, with per-item results"""
+    model, prefix, date_field = BULK_MODELS[collection]
+    valid, results = validate_bulk_items(model, await read_bulk_items(request))
+    if all_or_nothing and results:
+        return bulk_response(results, all_or_nothing, 0)
     
-    if category and category != "all":
-        problems = [p for p in problems if p.get("category") == category]
+    now = datetime.now()
+    records = []
+    for index, item in valid:
+        data = item.dict()
+        data["id"] = new_id(prefix)
+        if date_field:
+            data[date_field] = now.strftime("%Y-%m-%d")
+        data["college"] = college_id
+        records.append(data)
+        results.append({"index": index, "status": "created", "id": data["id"]})
     
-    return {"status": "success", "problems": problems, "total": len(problems)}
+    if records:
+        await run_in_threadpool(campus_store.insert_many, collection, college_id, records)
+        campus_broker.publish(collection, college_id, "created", records)
+    return bulk_response(results, all_or_nothing, len(records))
+
+@app.put("/api/colleges/{college_id}/{collection}/bulk")
+async def bulk_update(
+    college_id: str,
+    collection: Literal["problems", "wisdom", "alerts"],
+    request: Request,
+    all_or_nothing: bool = Query(False, description="Write nothing if any item is invalid")
+):
+    """Replace many records (matched by each item's id) in one storage transaction, with per-item results"""
+    model, _, _ = BULK_MODELS[collection]
+    valid, results = validate_bulk_items(model, await read_bulk_items(request))
+    records = []
+    for index, item in valid:
+        if not item.id:
+            results.append({"index": index, "status": "invalid", "errors": [{"loc": ["id"], "msg": "Field required"}]})
+            continue
+        records.append((index, item.dict()))
+    if all_or_nothing and results:
+        return bulk_response(results, all_or_nothing, 0)
+    
+    replaced = []
+    if records:
+        replaced = await run_in_threadpool(campus_store.update_many, collection, college_id, [r for _, r in records])
+    for (index, record), old in zip(records, replaced):
+        results.append({"index": index, "status": "updated" if old is not None else "not_found", "id": record["id"]})
+    return bulk_response(results, all_or_nothing, sum(old is not None for old in replaced))
+
+# ==================== Export Endpoints ====================
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def ndjson_lines(records, batch_size=500):
+    """NDJSON text in chunks of batch_size records (one send per chunk, not per record)"""
+    lines = []
+    for record in records:
+        lines.append(json.dumps(record) + "\n")
+        if len(lines) == batch_size:
+            yield "".join(lines)
+            lines = []
+    yield "".join(lines)
+
+def csv_lines(records, columns, batch_size=500):
+    """CSV text in chunks of batch_size rows; list/dict values are written as JSON"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, restval="", extrasaction="ignore")
+    writer.writeheader()
+    for i, record in enumerate(records, 1):
+        writer.writerow({
+            k: json.dumps(v) if isinstance(v, (list, dict)) else v for k, v in record.items()
+        })
+        if i % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def export_response(chunks, format, name):
+    return StreamingResponse(
+        chunks, media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'}
+    )
+
+@app.get("/api/colleges/{college_id}/{collection}/export")
+def export_collection(
+    college_id: str,
+    collection: Literal["problems", "wisdom", "alerts"],
+    format: Literal["ndjson", "csv"] = "ndjson"
+):
+    """Stream every record of a college's collection as NDJSON or CSV, batch by batch from storage"""
+    records = campus_store.iter_records(collection, college_id)
+    if format == "csv":
+        model = BULK_MODELS[collection][0]
+        return export_response(csv_lines(records, list(model.model_fields)), format, f"{college_id}_{collection}")
+    return export_response(ndjson_lines(records), format, f"{college_id}_{collection}")
+
+@app.get("/api/shards")
+def shard_stats():
+    """How colleges and records are spread over storage shards, and which worker owns each"""
+    if CAMPUS_SHARDS == 1:
+        return {"status": "success", "shards": 1, "sharded": False}
+    shards = campus_base_store.shard_stats()
+    for shard in shards:
+        shard["worker"] = worker_for_shard(shard["shard"], CAMPUS_WORKER_COUNT)
+    return {
+        "status": "success",
+        "shards": CAMPUS_SHARDS,
+        "sharded": True,
+        "worker": {"index": CAMPUS_WORKER_INDEX, "count": CAMPUS_WORKER_COUNT},
+        "per_shard": shards
+    }
+
+# ==================== Campus Data Endpoints ====================
+class CollectionQuery:
+    """Filter, sort and page parameters shared by the campus list endpoints"""
+
+    def __init__(
+        self,
+        category: Optional[str] = None,
+        status: Optional[str] = None,
+        severity: Optional[str] = None,
+        date_from: Optional[str] = Query(None, description="Inclusive, YYYY-MM-DD"),
+        date_to: Optional[str] = Query(None, description="Inclusive, YYYY-MM-DD"),
+        sort: Optional[str] = Query(None, pattern="^(upvotes|date)$"),
+        order: str = Query("desc", pattern="^(asc|desc)$"),
+        limit: Optional[int] = Query(None, ge=1, le=500, description="Page size; omit for every match"),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+        include_total: bool = Query(False, description="Count every match on later pages too"),
+    ):
+        self.filters = {
+            "category": category if category and category != "all" else None,
+            "status": status,
+            "severity": severity,
+            "date_from": date_from,
+            "date_to": date_to,
+        }
+        self.sort = sort
+        self.order = order
+        self.limit = limit
+        self.cursor = cursor
+        # Counting reads every match, so later pages skip it unless asked
+        self.count = cursor is None or include_total
+
+def query_collection(collection: str, college_id: str, params: CollectionQuery):
+    """Run a list query; total counts every match (None on later pages), next_cursor is None on the last page"""
+    try:
+        items, total, next_cursor = campus_store.query(
+            collection, college_id, params.filters, params.sort, params.order, params.limit, params.cursor,
+            params.count
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "success", collection: items, "total": total, "next_cursor": next_cursor}
+
+@app.get("/api/colleges/{college_id}/problems")
+def get_problems(college_id: str, request: Request, params: CollectionQuery = Depends()):
+    """Get problems for a college (filterable, sortable, paged when limit is given; ETag-aware)"""
+    return conditional_json(
+        request, campus_store.version("problems", college_id),
+        lambda: query_collection("problems", college_id, params)
+    )
 
 @app.post("/api/colleges/{college_id}/problems")
 def create_problem(college_id: str, problem: Problem):
     """Report a new problem"""
-    problems = load_json(f"problems_{college_id}.json", [])
-    
     problem_data = problem.dict()
-    problem_data["id"] = f"p{int(datetime.now().timestamp() * 1000)}"
+    problem_data["id"] = new_id("p")
     problem_data["reportedDate"] = datetime.now().strftime("%Y-%m-%d")
     problem_data["college"] = college_id
     
-    problems.append(problem_data)
-    save_json(f"problems_{college_id}.json", problems)
+    campus_store.insert("problems", college_id, problem_data)
+    campus_broker.publish("problems", college_id, "created", [problem_data])
     
     return {"status": "success", "problem": problem_data}
 
 @app.put("/api/colleges/{college_id}/problems/{problem_id}")
 def update_problem(college_id: str, problem_id: str, problem: Problem):
     """Update a problem"""
-    problems = load_json(f"problems_{college_id}.json", [])
+    problem_data = problem.dict()
+    problem_data["id"] = problem_id
     
-    for i, p in enumerate(problems):
-        if p["id"] == problem_id:
-            problem_data = problem.dict()
-            problem_data["id"] = problem_id
-            problems[i] = problem_data
-            save_json(f"problems_{college_id}.json", problems)
-            return {"status": "success", "problem": problem_data}
+    if campus_store.update("problems", college_id, problem_id, problem_data):
+        return {"status": "success", "problem": problem_data}
     
     raise HTTPException(status_code=404, detail="Problem not found")
 
 @app.delete("/api/colleges/{college_id}/problems/{problem_id}")
 def delete_problem(college_id: str, problem_id: str):
     """Delete a problem"""
-    problems = load_json(f"problems_{college_id}.json", [])
-    problems = [p for p in problems if p["id"] != problem_id]
-    save_json(f"problems_{college_id}.json", problems)
+    campus_store.delete("problems", college_id, problem_id)
     return {"status": "success", "message": "Problem deleted"}
 
 @app.get("/api/colleges/{college_id}/wisdom")
-def get_wisdom(college_id: str, category: Optional[str] = None):
-    """Get wisdom tips for a college"""
-    wisdom = load_json(f"wisdom_{college_id}.json", [])
-    
-    if category and category != "all":
-        wisdom = [w for w in wisdom if w.get("category") == category]
-    
-    return {"status": "success", "wisdom": wisdom, "total": len(wisdom)}
+def get_wisdom(college_id: str, request: Request, params: CollectionQuery = Depends()):
+    """Get wisdom tips for a college (filterable, sortable, paged when limit is given; ETag-aware)"""
+    return conditional_json(
+        request, campus_store.version("wisdom", college_id),
+        lambda: query_collection("wisdom", college_id, params)
+    )
 
 @app.post("/api/colleges/{college_id}/wisdom")
 def create_wisdom(college_id: str, wisdom: WisdomTip):
     """Share a wisdom tip"""
-    wisdom_list = load_json(f"wisdom_{college_id}.json", [])
-    
     wisdom_data = wisdom.dict()
-    wisdom_data["id"] = f"w{int(datetime.now().timestamp() * 1000)}"
+    wisdom_data["id"] = new_id("w")
     wisdom_data["date"] = datetime.now().strftime("%Y-%m-%d")
     wisdom_data["college"] = college_id
     
-    wisdom_list.append(wisdom_data)
-    save_json(f"wisdom_{college_id}.json", wisdom_list)
+    campus_store.insert("wisdom", college_id, wisdom_data)
+    campus_broker.publish("wisdom", college_id, "created", [wisdom_data])
     
     return {"status": "success", "wisdom": wisdom_data}
 
 @app.get("/api/colleges/{college_id}/alerts")
-def get_alerts(college_id: str):
-    """Get alerts for a college"""
-    alerts = load_json(f"alerts_{college_id}.json", [])
-    return {"status": "success", "alerts": alerts, "total": len(alerts)}
+def get_alerts(college_id: str, request: Request, params: CollectionQuery = Depends()):
+    """Get alerts for a college (filterable, sortable, paged when limit is given; ETag-aware)"""
+    return conditional_json(
+        request, campus_store.version("alerts", college_id),
+        lambda: query_collection("alerts", college_id, params)
+    )
 
 @app.post("/api/colleges/{college_id}/alerts")
 def create_alert(college_id: str, alert: Alert):
     """Create a new alert"""
-    alerts = load_json(f"alerts_{college_id}.json", [])
-    
     alert_data = alert.dict()
-    alert_data["id"] = f"a{int(datetime.now().timestamp() * 1000)}"
+    alert_data["id"] = new_id("a")
     alert_data["college"] = college_id
     
-    alerts.append(alert_data)
-    save_json(f"alerts_{college_id}.json", alerts)
+    campus_store.insert("alerts", college_id, alert_data)
+    campus_broker.publish("alerts", college_id, "created", [alert_data])
     
     return {"status": "success", "alert": alert_data}
 
+@app.get("/api/colleges/{college_id}/search")
+def search_campus(
+    college_id: str,
+    q: str = Query(..., min_length=1, description="Free-text query"),
+    collections: Optional[str] = Query(None, description="Comma-separated subset of problems,wisdom"),
+    limit: int = Query(20, ge=1, le=100),
+    prefix: bool = Query(True, description="Match the last word as a prefix (search-as-you-type)"),
+):
+    """Full-text search over a college's problems and wisdom tips, ranked by BM25"""
+    selected = [c.strip() for c in collections.split(",") if c.strip()] if collections else list(SEARCH_FIELDS)
+    try:
+        found = campus_store.search(college_id, q, selected, limit, prefix)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "success", "query": q, **found}
+
+@app.get("/api/colleges/{college_id}/stream")
+async def stream_campus(
+    college_id: str,
+    collections: str = Query("problems,wisdom,alerts", description="Comma-separated collections to follow"),
+):
+    """
+    Server-sent events: newly created problems, wisdom tips and alerts of one college
+
+    Each event's type is its collection and its data is {id, collection, action,
+    college, record}. A client that falls too far behind gets a `resync` event
+    and the stream ends; it should refetch the lists and reconnect.
+    """
+    selected = {c.strip() for c in collections.split(",") if c.strip()}
+    unknown = selected - {"problems", "wisdom", "alerts"}
+    if unknown or not selected:
+        raise HTTPException(status_code=400, detail=f"Unknown collections: {', '.join(sorted(unknown)) or '(none)'}")
+    subscription = campus_broker.subscribe(college_id, selected)
+    
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                event = await subscription.get(STREAM_HEARTBEAT_SECONDS)
+                if event is None:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+                elif event is RESYNC:
+                    yield "event: resync\ndata: {}\n\n"
+                    return
+                else:
+                    yield format_sse(event)
+        finally:
+            campus_broker.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ==================== Analytics Endpoints ====================
 @app.get("/api/colleges/{college_id}/analytics")
 def get_analytics(college_id: str):
-    """Get analytics for a college"""
-    problems = load_json(f"problems_{college_id}.json", [])
-    wisdom = load_json(f"wisdom_{college_id}.json", [])
-    alerts = load_json(f"alerts_{college_id}.json", [])
-    
-    # Problem analytics
-    problem_categories = {}
-    problem_status = {}
-    for p in problems:
-        cat = p.get("category", "Unknown")
-        status = p.get("status", "Unknown")
-        problem_categories[cat] = problem_categories.get(cat, 0) + 1
-        problem_status[status] = problem_status.get(status, 0) + 1
-    
-    # Wisdom analytics
-    wisdom_categories = {}
-    for w in wisdom:
-        cat = w.get("category", "Unknown")
-        wisdom_categories[cat] = wisdom_categories.get(cat, 0) + 1
-    
+    """Get analytics for a college (served from counters kept current on every write)"""
     return {
         "status": "success",
-        "analytics": {
-            "total_problems": len(problems),
-            "total_wisdom": len(wisdom),
-            "total_alerts": len(alerts),
-            "problem_by_category": problem_categories,
-            "problem_by_status": problem_status,
-            "wisdom_by_category": wisdom_categories
-        }
+        "analytics": campus_store.analytics(college_id)
     }
 
+@app.post("/api/colleges/{college_id}/analytics/rebuild")
+def rebuild_analytics(college_id: str):
+    """Recount a college's analytics counters from storage"""
+    campus_store.rebuild(college_id)
+    return {"status": "success", "analytics": campus_store.analytics(college_id)}
+
+@app.post("/api/analytics/rebuild")
+def rebuild_all_analytics():
+    """Recount analytics counters for every college from storage"""
+    return {"status": "success", "colleges": campus_store.rebuild()}
+
 # ==================== Events Management ====================
+# Catalog used when campus_data/events.json doesn't exist
+DEFAULT_EVENTS = [
+    {
+        "id": "evt1",
+        "name": "Hacksetu",
+        "type": "Hackathon",
+        "level": "National",
+        "duration_days": 2,
+        "description": "National level hackathon focused on innovative solutions",
+        "date": "2026-03-15",
+        "location": "Main Campus",
+        "registrations": 0,
+        "max_participants": 500
+    },
+    {
+        "id": "evt2",
+        "name": "Smart India Hackathon",
+        "type": "Hackathon",
+        "level": "National",
+        "duration_days": 3,
+        "description": "Government initiative for solving real-world problems",
+        "date": "2026-04-20",
+        "location": "Multiple Locations",
+        "registrations": 0,
+        "max_participants": 1000
+    },
+    {
+        "id": "evt3",
+        "name": "Ami Chroma",
+        "type": "Cultural",
+        "level": "University",
+        "duration_days": 3,
+        "description": "Annual cultural fest with competitions and performances",
+        "date": "2026-03-25",
+        "location": "Auditorium",
+        "registrations": 0,
+        "max_participants": 2000
+    },
+    {
+        "id": "evt4",
+        "name": "Init Maths",
+        "type": "Training",
+        "level": "Department",
+        "duration_days": 6,
+        "description": "Mathematics workshop for competitive programming",
+        "date": "2026-03-10",
+        "location": "Department Block",
+        "registrations": 0,
+        "max_participants": 100
+    },
+    {
+        "id": "evt5",
+        "name": "TechFest",
+        "type": "Technical",
+        "level": "University",
+        "duration_days": 2,
+        "description": "Technical festival with coding, robotics, and AI competitions",
+        "date": "2026-04-05",
+        "location": "Tech Park",
+        "registrations": 0,
+        "max_participants": 800
+    },
+]
+
+def load_events():
+    """Event catalog with live registration counts"""
+    events = load_json("events.json", DEFAULT_EVENTS)
+    event_registry.sync_events(events)
+    return event_registry.apply_counts(events)
+
 @app.get("/api/events")
-def get_all_events():
-    """Get all available events"""
-    events = load_json("events.json", [
-        {
-            "id": "evt1",
-            "name": "Hacksetu",
-            "type": "Hackathon",
-            "level": "National",
-            "duration_days": 2,
-            "description": "National level hackathon focused on innovative solutions",
-            "date": "2026-03-15",
-            "location": "Main Campus",
-            "registrations": 0,
-            "max_participants": 500
-        },
-        {
-            "id": "evt2",
-            "name": "Smart India Hackathon",
-            "type": "Hackathon",
-            "level": "National",
-            "duration_days": 3,
-            "description": "Government initiative for solving real-world problems",
-            "date": "2026-04-20",
-            "location": "Multiple Locations",
-            "registrations": 0,
-            "max_participants": 1000
-        },
-        {
-            "id": "evt3",
-            "name": "Ami Chroma",
-            "type": "Cultural",
-            "level": "University",
-            "duration_days": 3,
-            "description": "Annual cultural fest with competitions and performances",
-            "date": "2026-03-25",
-            "location": "Auditorium",
-            "registrations": 0,
-            "max_participants": 2000
-        },
-        {
-            "id": "evt4",
-            "name": "Init Maths",
-            "type": "Training",
-            "level": "Department",
-            "duration_days": 6,
-            "description": "Mathematics workshop for competitive programming",
-            "date": "2026-03-10",
-            "location": "Department Block",
-            "registrations": 0,
-            "max_participants": 100
-        },
-        {
-            "id": "evt5",
-            "name": "TechFest",
-            "type": "Technical",
-            "level": "University",
-            "duration_days": 2,
-            "description": "Technical festival with coding, robotics, and AI competitions",
-            "date": "2026-04-05",
-            "location": "Tech Park",
-            "registrations": 0,
-            "max_participants": 800
-        },
-    ])
+def get_all_events(request: Request):
+    """Get all available events (ETag-aware)"""
+    def build():
+        events = load_events()
+        return {"status": "success", "events": events, "total": len(events)}
     
-    return {"status": "success", "events": events, "total": len(events)}
+    version = (_file_stamp(os.path.join(DATA_DIR, "events.json")), event_registry.version())
+    return conditional_json(request, version, build)
 
 @app.post("/api/events/{event_id}/register")
-def register_for_event(event_id: str, student: StudentProfile):
+def register_for_event(
+    event_id: str,
+    student: StudentProfile,
+    background: bool = Query(False, description="Respond right away; fetch guidance from guidance_url later")
+):
     """Register a student for an event and get ML-powered guidance"""
-    events = load_json("events.json", [])
+    events = load_events()
     event = next((e for e in events if e["id"] == event_id), None)
     
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     
+    # Take a place atomically; the capacity check can't race with other registrations
+    try:
+        event["registrations"] = event_registry.register(event_id)
+    except EventFullError:
+        raise HTTPException(status_code=409, detail=f"{event['name']} is full")
+    
+    if background:
+        registration_id = new_id("r")
+        guidance_status = None
+        if guidance_system:
+            guidance_status = guidance_jobs.submit(
+                registration_id, event_id,
+                functools.partial(
+                    guidance_system.get_recommendations_for_registered_event, student.dict(), event["name"]
+                )
+            )
+        return {
+            "status": "success",
+            "message": f"Successfully registered for {event['name']}",
+            "event": event,
+            "guidance": None,
+            "registration_id": registration_id,
+            "guidance_status": guidance_status,
+            "guidance_url": f"/api/registrations/{registration_id}/guidance" if guidance_status else None
+        }
+    
     # Get ML guidance if available
     guidance = None
     if guidance_system:
@@ -427,10 +1010,6 @@ def register_for_event(event_id: str, student: StudentProfile):
         except Exception as e:
             print(f"Warning: Could not generate guidance: {e}")
     
-    # Update event registrations
-    event["registrations"] = event.get("registrations", 0) + 1
-    save_json("events.json", events)
-    
     return {
         "status": "success",
         "message": f"Successfully registered for {event['name']}",
@@ -438,6 +1017,21 @@ def register_for_event(event_id: str, student: StudentProfile):
         "guidance": guidance
     }
 
+@app.get("/api/registrations/{registration_id}/guidance")
+def get_registration_guidance(registration_id: str):
+    """Guidance computed in the background for a registration (guidance_status: pending, done or failed)"""
+    job = guidance_jobs.get(registration_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No guidance job for this registration")
+    return {
+        "status": "success",
+        "registration_id": registration_id,
+        "event_id": job["event_id"],
+        "guidance_status": job["status"],
+        "guidance": job["guidance"],
+        "error": job["error"]
+    }
+
 if __name__ == "__main__":
     import uvicorn
     print("\n" + "="*80)
@@ -0,0 +1,177 @@
+"""
+Campus Analytics
+Per-college analytics counters kept current on every campus store write
+"""
+
+import threading
+from campus_store import COLLECTIONS
+
+# Counter name -> (collection, record field) it groups by
+GROUPED_COUNTERS = {
+    'problem_by_category': ('problems', 'category'),
+    'problem_by_status': ('problems', 'status'),
+    'wisdom_by_category': ('wisdom', 'category'),
+}
+
+
+class _CollegeCounters:
+    def __init__(self):
+        self.totals = dict.fromkeys(COLLECTIONS, 0)
+        self.groups = {name: {} for name in GROUPED_COUNTERS}
+
+    def add(self, collection, record, sign):
+        self.totals[collection] += sign
+        for name, (counted_collection, field) in GROUPED_COUNTERS.items():
+            if counted_collection != collection:
+                continue
+            group = self.groups[name]
+            key = record.get(field, "Unknown")
+            count = group.get(key, 0) + sign
+            if count:
+                group[key] = count
+            else:
+                group.pop(key, None)
+
+    def snapshot(self):
+        return {
+            "total_problems": self.totals['problems'],
+            "total_wisdom": self.totals['wisdom'],
+            "total_alerts": self.totals['alerts'],
+            "problem_by_category": dict(self.groups['problem_by_category']),
+            "problem_by_status": dict(self.groups['problem_by_status']),
+            "wisdom_by_category": dict(self.groups['wisdom_by_category']),
+        }
+
+
+class CountingCampusStore:
+    """
+    Campus store wrapper that maintains analytics counters per college
+
+    Counters are built with one pass over storage at startup and then adjusted
+    by every insert, update and delete (updates and deletes report the records
+    they replaced or removed), so analytics() is a dictionary copy instead of a
+    scan of three collections. A write and its counter update happen under the
+    college's own lock, which also lets rebuild() recount a college from storage
+    without racing its writes; writes to different colleges don't wait on each other.
+
+    Each (collection, college) also has a write counter; version() combines it
+    with the store's own version token, for ETags.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.backend = store.backend
+        self._colleges = {}
+        self._writes = {}
+        self._lock = threading.Lock()
+        self._college_locks = {}
+        self.rebuild()
+
+    def __getattr__(self, name):
+        # Reads and anything else go straight to the wrapped store
+        return getattr(self.store, name)
+
+    def _lock_for(self, college_id):
+        lock = self._college_locks.get(college_id)
+        if lock is None:
+            with self._lock:
+                lock = self._college_locks.setdefault(college_id, threading.RLock())
+        return lock
+
+    def _counters(self, college_id):
+        counters = self._colleges.get(college_id)
+        if counters is None:
+            counters = self._colleges[college_id] = _CollegeCounters()
+        return counters
+
+    def insert(self, collection, college_id, record):
+        with self._lock_for(college_id):
+            result = self.store.insert(collection, college_id, record)
+            self._counters(college_id).add(collection, record, 1)
+            self._written(collection, college_id)
+        return result
+
+    def insert_many(self, collection, college_id, records):
+        with self._lock_for(college_id):
+            result = self.store.insert_many(collection, college_id, records)
+            counters = self._counters(college_id)
+            for record in records:
+                counters.add(collection, record, 1)
+            self._written(collection, college_id)
+        return result
+
+    def update(self, collection, college_id, record_id, record):
+        with self._lock_for(college_id):
+            replaced = self.store.update(collection, college_id, record_id, record)
+            if replaced is not None:
+                counters = self._counters(college_id)
+                counters.add(collection, replaced, -1)
+                counters.add(collection, record, 1)
+                self._written(collection, college_id)
+        return replaced
+
+    def update_many(self, collection, college_id, records):
+        with self._lock_for(college_id):
+            replaced = self.store.update_many(collection, college_id, records)
+            counters = self._counters(college_id)
+            for record, old in zip(records, replaced):
+                if old is not None:
+                    counters.add(collection, old, -1)
+                    counters.add(collection, record, 1)
+            if any(old is not None for old in replaced):
+                self._written(collection, college_id)
+        return replaced
+
+    def delete(self, collection, college_id, record_id):
+        with self._lock_for(college_id):
+            removed = self.store.delete(collection, college_id, record_id)
+            counters = self._counters(college_id)
+            for record in removed:
+                counters.add(collection, record, -1)
+            if removed:
+                self._written(collection, college_id)
+        return removed
+
+    def _written(self, collection, college_id):
+        # Bumped after the store write, so a reader never pairs a new version with old data
+        key = (collection, college_id)
+        self._writes[key] = self._writes.get(key, 0) + 1
+
+    def version(self, collection, college_id):
+        """
+        Changes whenever a college's collection may have changed
+
+        Writes through this wrapper bump a counter; the store's version token
+        (file stamps, log sequence) catches edits made outside the server.
+        """
+        return self._writes.get((collection, college_id), 0), self.store.version_token(collection, college_id)
+
+    def analytics(self, college_id):
+        """Totals and category/status breakdowns for one college"""
+        with self._lock_for(college_id):
+            counters = self._colleges.get(college_id)
+            return (counters or _CollegeCounters()).snapshot()
+
+    def rebuild(self, college_id=None):
+        """
+        Recount from storage, for one college or all of them
+
+        Returns:
+            Number of colleges recounted
+        """
+        if college_id is None:
+            college_ids = sorted({c for collection in COLLECTIONS for c in self.store.colleges(collection)})
+            # Colleges that no longer have any records
+            for college in set(self._colleges) - set(college_ids):
+                with self._lock_for(college):
+                    self._colleges.pop(college, None)
+        else:
+            college_ids = [college_id]
+        for college in college_ids:
+            with self._lock_for(college):
+                counters = _CollegeCounters()
+                for collection in COLLECTIONS:
+                    for record in self.store.list(collection, college):
+                        counters.add(collection, record, 1)
+                self._colleges[college] = counters
+        return len(college_ids)
@@ -0,0 +1,183 @@
+"""
+Campus Pub/Sub
+In-process fan-out of campus writes to per-college subscribers (server-sent events)
+"""
+
+import json
+import asyncio
+import threading
+
+DEFAULT_QUEUE_SIZE = 100
+# Marker queued when a subscriber fell too far behind; its stream tells the client to refetch
+RESYNC = object()
+
+
+class Subscription:
+    """One subscriber's bounded queue, owned by the event loop that serves it"""
+
+    def __init__(self, broker, college_id, collections, max_queue):
+        self.broker = broker
+        self.college_id = college_id
+        self.collections = set(collections)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(max_queue)
+        self.closed = False
+
+    def _deliver(self, events):
+        # Runs on the subscriber's loop
+        for event in events:
+            if self.closed:
+                return
+            try:
+                self.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A slow client gets a resync instead of blocking publishers or growing without bound
+                while not self.queue.empty():
+                    self.queue.get_nowait()
+                self.queue.put_nowait(RESYNC)
+                self.closed = True
+                self.broker._overflowed(self)
+
+    async def get(self, timeout=None):
+        """Next event, RESYNC after an overflow, or None if timeout passes first"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class CampusBroker:
+    """
+    Publish/subscribe hub for campus writes, keyed by college
+
+    publish() may be called from any thread (the sync route handlers run in a
+    thread pool); each event is handed to the subscriber's own event loop with
+    call_soon_threadsafe, so publishing never blocks on a subscriber and an idle
+    subscriber is just a coroutine waiting on an empty queue. Queues are
+    bounded: a subscriber that falls max_queue events behind is dropped with a
+    RESYNC marker.
+    """
+
+    def __init__(self, max_queue=DEFAULT_QUEUE_SIZE):
+        self.max_queue = max_queue
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self.sequence = 0
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    def subscribe(self, college_id, collections):
+        """Register a subscriber; must be called from the event loop that will read it"""
+        subscription = Subscription(self, college_id, collections, self.max_queue)
+        with self._lock:
+            self._subscribers.setdefault(college_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.closed = True
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.college_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.college_id]
+
+    def _overflowed(self, subscription):
+        self.overflows += 1
+        self.unsubscribe(subscription)
+
+    def publish(self, collection, college_id, action, records):
+        """Fan out one event per record to the college's subscribers of collection"""
+        with self._lock:
+            subscribers = [s for s in self._subscribers.get(college_id, ()) if collection in s.collections]
+            events = []
+            for record in records:
+                self.sequence += 1
+                events.append({"id": self.sequence, "collection": collection, "action": action,
+                               "college": college_id, "record": record})
+            self.published += len(events)
+        if not subscribers or not events:
+            return
+        # One cross-thread wakeup per event loop, however many subscribers it serves
+        by_loop = {}
+        for subscription in subscribers:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, loop_subscribers in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver_all, loop_subscribers, events)
+            except RuntimeError:
+                # The loop is gone (server shutting down)
+                for subscription in loop_subscribers:
+                    self.unsubscribe(subscription)
+                continue
+            self.delivered += len(events) * len(loop_subscribers)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "colleges": len(self._subscribers),
+                "published": self.published,
+                "delivered": self.delivered,
+                "overflows": self.overflows,
+                "max_queue": self.max_queue,
+            }
+
+
+def _deliver_all(subscriptions, events):
+    for subscription in subscriptions:
+        subscription._deliver(events)
+
+
+def format_sse(event):
+    """An event as a server-sent events frame (event type = collection)"""
+    return f"id: {event['id']}\nevent: {event['collection']}\ndata: {json.dumps(event)}\n\n"
+
+
+if __name__ == "__main__":
+    import time
+
+    print("="*80)
+    print("FAN-OUT BENCHMARK: one publisher thread, many idle and active subscribers")
+    print("="*80)
+
+    async def main():
+        broker = CampusBroker(max_queue=1000)
+        subscriptions = [broker.subscribe(f"college{i % 10}", ["problems", "alerts"]) for i in range(5000)]
+        received = [0]
+
+        async def consume(subscription):
+            while (event := await subscription.get()) is not None and event is not RESYNC:
+                received[0] += 1
+
+        tasks = [asyncio.create_task(consume(s)) for s in subscriptions]
+        await asyncio.sleep(0.1)
+
+        # 5,000 idle subscribers: nothing runs while nothing is published
+        start = time.process_time()
+        await asyncio.sleep(1.0)
+        print(f"\nCPU used by 5,000 idle subscribers over 1 s: {(time.process_time() - start) * 1000:.1f} ms")
+
+        start = time.perf_counter()
+        publisher = threading.Thread(target=lambda: [
+            broker.publish("alerts", "college3", "created", [{"id": f"a{i}"}]) for i in range(200)
+        ])
+        publisher.start()
+        publisher.join()
+        while received[0] < 200 * 500:
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        print(f"200 alerts to college3's 500 subscribers: {received[0]} deliveries in {elapsed * 1000:.0f} ms")
+
+        slow = broker.subscribe("quiet", ["alerts"])
+        broker.publish("alerts", "quiet", "created", [{"id": f"b{i}"} for i in range(1001)])
+        await asyncio.sleep(0.1)
+        overflowed = slow.queue.get_nowait() is RESYNC and slow.queue.empty()
+        print(f"Subscriber that never reads is dropped with a resync: {'✓' if overflowed else '✗'}")
+        print(f"Stats: {broker.stats()}")
+
+        for task in tasks:
+            task.cancel()
+
+    asyncio.run(main())
@@ -0,0 +1,456 @@
+"""
+Campus Search
+In-process inverted index with BM25 ranking over problems and wisdom tips
+"""
+
+import re
+import math
+import heapq
+import bisect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Collection -> (record field, weight); a title word counts as much as two body words
+SEARCH_FIELDS = {
+    'problems': [('title', 2), ('description', 1)],
+    'wisdom': [('title', 2), ('content', 1)],
+}
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this to was were "
+    "will with".split()
+)
+BM25_K1 = 1.2
+BM25_B = 0.75
+# A prefix that matches more terms than this is searched with the most common ones only
+MAX_PREFIX_EXPANSIONS = 50
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercase alphanumeric words without stopwords"""
+    return [t for t in _TOKEN.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+class _CollectionIndex:
+    """Postings, document lengths and sorted vocabulary for one college's collection"""
+
+    def __init__(self, collection):
+        self.fields = SEARCH_FIELDS[collection]
+        self.postings = {}       # term -> {doc: weighted term frequency}
+        self.docs = {}           # doc -> record
+        self.lengths = {}        # doc -> weighted length
+        self.by_id = {}          # record id -> [doc, ...] in insertion order
+        self.total_length = 0
+        self.next_doc = 0
+        self.vocabulary = []     # sorted terms, for prefix lookups
+
+    def add(self, record):
+        doc = self.next_doc
+        self.next_doc += 1
+        frequencies = {}
+        for field, weight in self.fields:
+            for term in tokenize(record.get(field)):
+                frequencies[term] = frequencies.get(term, 0) + weight
+        for term, tf in frequencies.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                bisect.insort(self.vocabulary, term)
+            postings[doc] = tf
+        length = sum(frequencies.values())
+        self.docs[doc] = record
+        self.lengths[doc] = length
+        self.total_length += length
+        self.by_id.setdefault(record.get("id"), []).append(doc)
+
+    def remove(self, record_id, first_only=False):
+        docs = self.by_id.get(record_id)
+        if not docs:
+            return
+        removed = docs[:1] if first_only else list(docs)
+        for doc in removed:
+            docs.remove(doc)
+            record = self.docs.pop(doc)
+            self.total_length -= self.lengths.pop(doc)
+            for field, _ in self.fields:
+                for term in tokenize(record.get(field)):
+                    postings = self.postings.get(term)
+                    if postings is None or postings.pop(doc, None) is None or postings:
+                        continue
+                    del self.postings[term]
+                    del self.vocabulary[bisect.bisect_left(self.vocabulary, term)]
+        if not docs:
+            del self.by_id[record_id]
+
+    def expand(self, prefix):
+        """Indexed terms starting with prefix, most common first"""
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "￿", start)
+        terms = self.vocabulary[start:end]
+        if len(terms) > MAX_PREFIX_EXPANSIONS:
+            terms = heapq.nlargest(MAX_PREFIX_EXPANSIONS, terms, key=lambda t: len(self.postings[t]))
+        return terms
+
+    def top(self, query_terms, limit):
+        """
+        BM25 top-k over the documents matching at least one query word
+
+        Words are scored rarest first. Once the k-th best score so far beats the
+        most the remaining (common) words could add, documents that only contain
+        those words can't reach the top k, so the remaining words just top up
+        the scores of documents already found instead of walking their whole
+        posting lists.
+
+        Args:
+            query_terms: list of alternatives per query word; a word given as a
+                prefix has several, and a document scores its best one
+            limit: k
+
+        Returns:
+            ([(score, doc), ...] best first, number of matching documents, whether
+            that number is exact). Once pruning starts the documents that only hold
+            the skipped words are never visited, so the count becomes a lower bound.
+        """
+        n_docs = len(self.docs)
+        if not n_docs:
+            return [], 0, True
+        average_length = self.total_length / n_docs or 1
+        # BM25 term weight is idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avgdl))
+        k_base = BM25_K1 * (1 - BM25_B)
+        k_length = BM25_K1 * BM25_B / average_length
+        lengths = self.lengths
+
+        words = []
+        for alternatives in query_terms:
+            postings = [(math.log(1 + (n_docs - len(p) + 0.5) / (len(p) + 0.5)) * (BM25_K1 + 1), p)
+                        for p in (self.postings.get(t) for t in alternatives) if p]
+            if postings:
+                # tf / (tf + K) < 1, so a word adds at most its largest weighted idf
+                words.append((max(idf for idf, _ in postings), postings))
+        if not words:
+            return [], 0, True
+        words.sort(key=lambda w: -w[0])
+
+        scores = {}
+        pruned = False
+        largest = 0
+        remaining = sum(bound for bound, _ in words)
+        for bound, postings in words:
+            closed = len(scores) >= limit and heapq.nlargest(limit, scores.values())[-1] > remaining
+            remaining -= bound
+            pruned = pruned or closed
+            largest = max(largest, max(len(p) for _, p in postings))
+            if len(postings) == 1 and not closed:
+                # Plain word, nothing pruned: add straight into the scores
+                idf, p = postings[0]
+                for doc, tf in p.items():
+                    scores[doc] = scores.get(doc, 0) + idf * tf / (tf + k_base + k_length * lengths[doc])
+                continue
+            best = {}
+            for idf, p in postings:
+                if closed and len(scores) < len(p):
+                    pairs = ((doc, p[doc]) for doc in scores if doc in p)
+                else:
+                    pairs = p.items()
+                for doc, tf in pairs:
+                    s = idf * tf / (tf + k_base + k_length * lengths[doc])
+                    if s > best.get(doc, 0):
+                        best[doc] = s
+            for doc, s in best.items():
+                scores[doc] = scores.get(doc, 0) + s
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        # Without pruning every matching document was scored; with it, at least the
+        # longest posting list matched (it may be one of the skipped ones)
+        total = max(len(scores), largest) if pruned else len(scores)
+        return [(score, doc) for doc, score in top], total, not pruned
+
+
+class SearchableCampusStore:
+    """
+    Campus store wrapper that keeps a full-text index of problems and wisdom tips
+
+    A college's first search starts building its index on a background
+    thread and is answered by scanning storage; so are its other searches
+    until the index is ready. From then on the index is updated by every
+    insert, update and delete that goes through the wrapper, so a search
+    touches only the postings of its query terms instead of downloading and
+    scanning the whole collection. The last query word is also matched as a
+    prefix, for search-as-you-type. Each college's writes and searches share
+    that college's lock only, and a build holds it only while it reads storage
+    and while it catches up with the writes made during the build.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.backend = store.backend
+        self._indexes = {}
+        self._building = {}      # (collection, college) -> writes made while its index is built
+        self._scheduled = set()
+        self._generation = 0     # bumped by reindex(), so builds started before it are dropped
+        self._lock = threading.Lock()
+        self._college_locks = {}
+        self._builder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-index")
+
+    def __getattr__(self, name):
+        # Reads, analytics and anything else go straight to the wrapped store
+        return getattr(self.store, name)
+
+    def _lock_for(self, college_id):
+        lock = self._college_locks.get(college_id)
+        if lock is None:
+            with self._lock:
+                lock = self._college_locks.setdefault(college_id, threading.RLock())
+        return lock
+
+    def _schedule(self, key):
+        """Start building an index in the background unless it is built or under way"""
+        with self._lock:
+            if key in self._indexes or key in self._scheduled:
+                return
+            self._scheduled.add(key)
+            generation = self._generation
+        self._builder.submit(self._build, key, generation)
+
+    def _build(self, key, generation):
+        collection, college_id = key
+        try:
+            with self._lock_for(college_id):
+                # From here on, writes are queued for the new index instead of being lost
+                self._building[key] = []
+                records = self.store.list(collection, college_id)
+            index = _CollectionIndex(collection)
+            for record in records:
+                index.add(record)
+            with self._lock_for(college_id):
+                for apply in self._building.pop(key):
+                    apply(index)
+                if generation == self._generation:
+                    self._indexes[key] = index
+        finally:
+            self._building.pop(key, None)
+            with self._lock:
+                self._scheduled.discard(key)
+
+    def _apply(self, collection, college_id, change):
+        """Apply change(index) to the college's index, or queue it for the build in progress"""
+        key = (collection, college_id)
+        index = self._indexes.get(key)
+        if index is not None:
+            change(index)
+        elif key in self._building:
+            self._building[key].append(change)
+
+    def insert(self, collection, college_id, record):
+        with self._lock_for(college_id):
+            result = self.store.insert(collection, college_id, record)
+            self._apply(collection, college_id, lambda index: index.add(record))
+        return result
+
+    def insert_many(self, collection, college_id, records):
+        with self._lock_for(college_id):
+            result = self.store.insert_many(collection, college_id, records)
+
+            def add_all(index):
+                for record in records:
+                    index.add(record)
+            self._apply(collection, college_id, add_all)
+        return result
+
+    def update(self, collection, college_id, record_id, record):
+        with self._lock_for(college_id):
+            replaced = self.store.update(collection, college_id, record_id, record)
+            if replaced is not None:
+                self._apply(collection, college_id, lambda index: _replace(index, record_id, record))
+        return replaced
+
+    def update_many(self, collection, college_id, records):
+        with self._lock_for(college_id):
+            replaced = self.store.update_many(collection, college_id, records)
+            changed = [record for record, old in zip(records, replaced) if old is not None]
+
+            def replace_all(index):
+                for record in changed:
+                    _replace(index, record["id"], record)
+            self._apply(collection, college_id, replace_all)
+        return replaced
+
+    def delete(self, collection, college_id, record_id):
+        with self._lock_for(college_id):
+            removed = self.store.delete(collection, college_id, record_id)
+            if removed:
+                self._apply(collection, college_id, lambda index: index.remove(record_id))
+        return removed
+
+    def _scan(self, collection, college_id, terms, limit):
+        """
+        Rank straight from storage while the index is built
+
+        Scores are weighted substring counts rather than BM25 (every query word
+        is effectively a prefix), which is enough to bridge the build.
+        """
+        fields = SEARCH_FIELDS[collection]
+        matches = []
+        for position, record in enumerate(self.store.list(collection, college_id)):
+            score = 0
+            for field, weight in fields:
+                text = (record.get(field) or "").lower()
+                for term in terms:
+                    score += weight * text.count(term)
+            if score:
+                matches.append((float(score), -position, collection, record))
+        return heapq.nlargest(limit, matches, key=lambda m: (m[0], m[1])), len(matches)
+
+    def search(self, college_id, query, collections=None, limit=20, prefix=True):
+        """
+        Rank a college's problems and wisdom tips against a free-text query
+
+        Args:
+            college_id: college to search
+            query: free text; stopwords are ignored
+            collections: subset of SEARCH_FIELDS to search (default: all)
+            limit: number of results to return
+            prefix: also match the last query word as a prefix
+
+        Returns:
+            dict with results (collection, score and record each), total matches,
+            total_exact (False when total is a lower bound, see _CollectionIndex.top)
+            and indexed (False while the college's index is still being built)
+        """
+        collections = collections or list(SEARCH_FIELDS)
+        for collection in collections:
+            if collection not in SEARCH_FIELDS:
+                raise ValueError(f"Collection {collection} is not searchable")
+        terms = tokenize(query)
+        matches, total, exact, indexed = [], 0, True, True
+        for collection in collections:
+            key = (collection, college_id)
+            if key not in self._indexes:
+                self._schedule(key)
+            if not terms:
+                continue
+            with self._lock_for(college_id):
+                index = self._indexes.get(key)
+                if index is not None:
+                    query_terms = [[t] for t in terms]
+                    if prefix:
+                        query_terms[-1] = index.expand(terms[-1]) or [terms[-1]]
+                    top, matched, matched_exact = index.top(query_terms, limit)
+                    matches.extend((score, -doc, collection, index.docs[doc]) for score, doc in top)
+            if index is None:
+                # Not under the college lock: a scan is a plain storage read
+                indexed = False
+                top, matched = self._scan(collection, college_id, terms, limit)
+                matched_exact = True
+                matches.extend(top)
+            total += matched
+            exact = exact and matched_exact
+        top = heapq.nlargest(limit, matches, key=lambda m: (m[0], m[1]))
+        results = [
+            {"collection": collection, "score": round(score, 4), "record": record}
+            for score, _, collection, record in top
+        ]
+        return {"results": results, "total": total, "total_exact": exact, "indexed": indexed}
+
+    def wait_for_index(self, college_id, collections=None, timeout=None):
+        """Start building the college's indexes if needed and wait until they are ready"""
+        collections = collections or list(SEARCH_FIELDS)
+        for collection in collections:
+            self._schedule((collection, college_id))
+        done = threading.Event()
+        self._builder.submit(done.set)
+        # Builds run in submission order on one thread, so everything queued so far is finished
+        return done.wait(timeout)
+
+    def reindex(self, college_id=None):
+        """Drop built indexes (one college or all) so they are rebuilt from storage on the next search"""
+        with self._lock:
+            self._generation += 1
+        if college_id is None:
+            self._indexes = {}
+            return
+        with self._lock_for(college_id):
+            for collection in SEARCH_FIELDS:
+                self._indexes.pop((collection, college_id), None)
+
+    def search_stats(self):
+        stats = {
+            f"{college_id}/{collection}": {"documents": len(index.docs), "terms": len(index.postings)}
+            for (collection, college_id), index in list(self._indexes.items())
+        }
+        for collection, college_id in list(self._scheduled):
+            stats.setdefault(f"{college_id}/{collection}", {"building": True})
+        return stats
+
+
+def _replace(index, record_id, record):
+    # Stores replace the first record with the id, so the index does too
+    index.remove(record_id, first_only=True)
+    index.add(record)
+
+
+if __name__ == "__main__":
+    import time
+    import random
+    import shutil
+    import tempfile
+    from campus_log_store import LogCampusStore
+
+    print("="*80)
+    print("SEARCH BENCHMARK: 100,000 problems and wisdom tips in one college")
+    print("="*80)
+
+    random.seed(42)
+    # Zipf-distributed vocabulary, like real text: a few common words, a long tail of rare ones
+    common = ("projector wifi hostel mess canteen library exam lab internet water electricity bus parking "
+              "assignment placement timetable attendance faculty network printer fan classroom sports "
+              "seminar hackathon notes syllabus elective internship scholarship laptop charging").split()
+    words = common + [f"word{i}" for i in range(20000)]
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+
+    def text(n):
+        return " ".join(random.choices(words, weights, k=n))
+
+    directory = tempfile.mkdtemp()
+    store = SearchableCampusStore(LogCampusStore(directory, fsync=False))
+    store.store.insert_many("problems", "demo", [
+        {"id": f"p{i}", "title": text(6), "description": text(40), "category": "Infrastructure"}
+        for i in range(50000)
+    ])
+    store.store.insert_many("wisdom", "demo", [
+        {"id": f"w{i}", "title": text(6), "content": text(40), "category": "Academics"}
+        for i in range(50000)
+    ])
+
+    start = time.perf_counter()
+    found = store.search("demo", "scholarship", limit=10)
+    print(f"\nFirst search, scanned from storage while the index builds: "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms (indexed: {found['indexed']})")
+    start = time.perf_counter()
+    store.insert("problems", "demo", {"id": "during", "title": "quokka", "description": "written mid-build"})
+    print(f"Insert during the build: {(time.perf_counter() - start) * 1000:.1f} ms")
+    start = time.perf_counter()
+    store.wait_for_index("demo")
+    print(f"Index build (background): {(time.perf_counter() - start):.2f} s")
+    found = store.search("demo", "quokka")
+    print(f"Write made during the build is indexed: {'✓' if found['indexed'] and found['total'] == 1 else '✗'}")
+
+    for query in ["word4321", "scholarship", "schol", "exam timetable clash", "projector not working in lab"]:
+        start = time.perf_counter()
+        for _ in range(10):
+            found = store.search("demo", query, limit=10)
+        elapsed = (time.perf_counter() - start) / 10 * 1000
+        total = f"{found['total']}{'' if found['total_exact'] else '+'}"
+        print(f"  {query!r:35s} {total:>7s} matches  {elapsed:7.1f} ms")
+
+    start = time.perf_counter()
+    for i in range(200):
+        store.insert("problems", "demo", {"id": f"new{i}", "title": "zebra crossing", "description": text(20)})
+    print(f"\n200 indexed inserts: {(time.perf_counter() - start) / 200 * 1000:.2f} ms each")
+    total = store.search("demo", "zebr")["total"]
+    print(f"Prefix 'zebr' finds the new records: {total} {'✓' if total == 200 else '✗'}")
+    store.delete("problems", "demo", "new0")
+    total = store.search("demo", "zebra")["total"]
+    print(f"Deleted record leaves the index: {total} {'✓' if total == 199 else '✗'}")
+    store.close()
+    shutil.rmtree(directory)
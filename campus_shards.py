@@ -0,0 +1,403 @@
+"""
+Campus Shards
+Per-college sharding of campus storage: one independent store per shard, routed by college_id
+"""
+
+import os
+import re
+import json
+import time
+import zlib
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+from contextlib import contextmanager
+from campus_store import COLLECTIONS, DEFAULT_DATA_DIR, open_campus_store
+
+SHARDS_DIR = "shards"
+# Optional {"college_id": shard} overrides, e.g. to give a busy campus a shard of its own
+SHARD_MAP_FILE = "shard_map.json"
+# Shard count and pins the data in shards/ was actually written with
+LAYOUT_FILE = "layout.json"
+# Shards of a replaced layout are moved here rather than deleted
+RETIRED_DIR = "retired"
+# Held while a process checks and migrates the layout, so server workers don't migrate at once
+LOCK_FILE = "layout.lock"
+_SHARD_DIR = re.compile(r"^(\d+)-of-(\d+)$")
+
+
+def shard_for(college_id, shards, pins=None):
+    """Shard of a college: a pinned shard, else a hash that is stable across processes and restarts"""
+    if pins and college_id in pins:
+        return pins[college_id]
+    return zlib.crc32(college_id.encode()) % shards
+
+
+def worker_for_shard(shard, workers):
+    """Server worker that owns a shard when shards are spread over several processes"""
+    return shard % workers
+
+
+class ShardedCampusStore:
+    """
+    Campus store split into independent per-shard stores, routed by college_id
+
+    Every shard is a complete store of the configured backend in its own
+    directory ({data_dir}/shards/{i}-of-{n}/), so colleges on different shards
+    never share a database file, write lock, log or cache. Any college-scoped
+    call goes to exactly one shard; only colleges() and the stats touch them all.
+    Run shard-owning server processes (see worker_for_shard) so each shard is
+    written by one process. Open it with open_sharded_campus_store(), which
+    moves the data when the shard count or the pins change.
+    """
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, shards=4, backend=None, cache=None, pins=None):
+        """
+        Args:
+            data_dir: campus data directory (shards live in its shards/ subdirectory)
+            shards: number of shards
+            backend / cache: passed to open_campus_store for every shard
+            pins: {college_id: shard} overrides (default: read from shard_map.json)
+        """
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.data_dir = data_dir
+        self.shards = shards
+        self.pins = load_pins(data_dir, shards) if pins is None else pins
+        self.directories = _shard_directories(data_dir, shards)
+        self.stores = []
+        for directory in self.directories:
+            os.makedirs(directory, exist_ok=True)
+            self.stores.append(open_campus_store(directory, backend=backend, cache=cache))
+        self.backend = self.stores[0].backend
+
+    def shard_for(self, college_id):
+        return shard_for(college_id, self.shards, self.pins)
+
+    def store_for(self, college_id):
+        return self.stores[self.shard_for(college_id)]
+
+    def list(self, collection, college_id, category=None):
+        return self.store_for(college_id).list(collection, college_id, category)
+
+    def query(self, collection, college_id, filters=None, sort=None, order='desc', limit=None, cursor=None,
+              count=True):
+        return self.store_for(college_id).query(collection, college_id, filters, sort, order, limit, cursor, count)
+
+    def iter_records(self, collection, college_id, batch_size=500):
+        return self.store_for(college_id).iter_records(collection, college_id, batch_size)
+
+    def insert(self, collection, college_id, record):
+        return self.store_for(college_id).insert(collection, college_id, record)
+
+    def insert_many(self, collection, college_id, records):
+        return self.store_for(college_id).insert_many(collection, college_id, records)
+
+    def update(self, collection, college_id, record_id, record):
+        return self.store_for(college_id).update(collection, college_id, record_id, record)
+
+    def update_many(self, collection, college_id, records):
+        return self.store_for(college_id).update_many(collection, college_id, records)
+
+    def delete(self, collection, college_id, record_id):
+        return self.store_for(college_id).delete(collection, college_id, record_id)
+
+    def count(self, collection, college_id):
+        return self.store_for(college_id).count(collection, college_id)
+
+    def version_token(self, collection, college_id):
+        return self.store_for(college_id).version_token(collection, college_id)
+
+    def colleges(self, collection):
+        return sorted({college for store in self.stores for college in store.colleges(collection)})
+
+    def shard_stats(self):
+        """Colleges and record counts per shard"""
+        shards = []
+        for i, (directory, store) in enumerate(zip(self.directories, self.stores)):
+            colleges = {c for collection in COLLECTIONS for c in store.colleges(collection)}
+            shards.append({
+                'shard': i,
+                'directory': directory,
+                'colleges': len(colleges),
+                'pinned': sorted(c for c, shard in self.pins.items() if shard == i),
+                'records': {
+                    collection: sum(store.count(collection, c) for c in store.colleges(collection))
+                    for collection in COLLECTIONS
+                },
+            })
+        return shards
+
+    def stats(self):
+        return {
+            'backend': self.backend,
+            'shards': self.shards,
+            'per_shard': [store.stats() if hasattr(store, 'stats') else {} for store in self.stores],
+        }
+
+    def close(self):
+        for store in self.stores:
+            if hasattr(store, 'close'):
+                store.close()
+
+
+def load_pins(data_dir, shards):
+    """The {college_id: shard} overrides in data_dir/shard_map.json ({} when there is none)"""
+    path = os.path.join(data_dir, SHARD_MAP_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        pins = json.load(f)
+    if not isinstance(pins, dict):
+        raise ValueError(f"{SHARD_MAP_FILE} must be a JSON object of college_id: shard")
+    for college_id, shard in pins.items():
+        if isinstance(shard, bool) or not isinstance(shard, int):
+            raise ValueError(f"{SHARD_MAP_FILE}: shard {shard!r} for {college_id} is not an integer")
+        if not 0 <= shard < shards:
+            raise ValueError(f"{SHARD_MAP_FILE}: shard {shard} for {college_id} is out of range "
+                             f"(0-{shards - 1})")
+    return pins
+
+
+def _shard_directories(data_dir, shards):
+    return [os.path.join(data_dir, SHARDS_DIR, f"{i}-of-{shards}") for i in range(shards)]
+
+
+def _read_layout(root):
+    path = os.path.join(root, LAYOUT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _write_layout(root, layout):
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, LAYOUT_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(layout, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _existing_shard_counts(root):
+    """Shard counts that have directories under root"""
+    if not os.path.isdir(root):
+        return []
+    return sorted({int(m.group(2)) for m in map(_SHARD_DIR.match, os.listdir(root)) if m})
+
+
+def _retire(data_dir, shards):
+    """Move one layout's shard directories to shards/retired/<time>-<shards>/"""
+    directories = [d for d in _shard_directories(data_dir, shards) if os.path.exists(d)]
+    if not directories:
+        return None
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    destination = os.path.join(data_dir, SHARDS_DIR, RETIRED_DIR, f"{stamp}-{shards}")
+    suffix = 1
+    while os.path.exists(destination):
+        suffix += 1
+        destination = os.path.join(data_dir, SHARDS_DIR, RETIRED_DIR, f"{stamp}-{shards}-{suffix}")
+    os.makedirs(destination)
+    for directory in directories:
+        os.replace(directory, os.path.join(destination, os.path.basename(directory)))
+    return destination
+
+
+@contextmanager
+def _layout_lock(root):
+    """Exclusive lock on root/layout.lock, waiting for any other process that holds it"""
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, LOCK_FILE), 'a+') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after 10 seconds
+                    continue
+        # Closing the file releases the lock
+        yield
+
+
+def _clear(store, collection, college_id):
+    """Delete every record of one college in one collection from one store"""
+    for record_id in {r["id"] for r in store.iter_records(collection, college_id)}:
+        store.delete(collection, college_id, record_id)
+
+
+def _clear_college(store, college_id):
+    """Delete every record of one college from one store"""
+    for collection in COLLECTIONS:
+        _clear(store, collection, college_id)
+
+
+def _move_repinned(store, root, layout, verbose=True):
+    """
+    Move colleges whose shard changed with the pins, one college at a time
+
+    The layout file is updated after each copy and before the old copy is
+    deleted, so an interrupted move is finished (not duplicated) next time.
+    """
+    written_pins = layout["pins"]
+    moved = []
+    for college_id in sorted(set(written_pins) | set(store.pins)):
+        source = shard_for(college_id, store.shards, written_pins)
+        target = store.shard_for(college_id)
+        if source == target:
+            continue
+        # Leftovers of an interrupted move to the same shard
+        _clear_college(store.stores[target], college_id)
+        for collection in COLLECTIONS:
+            records = list(store.stores[source].iter_records(collection, college_id))
+            if records:
+                store.stores[target].insert_many(collection, college_id, records)
+        if college_id in store.pins:
+            written_pins[college_id] = store.pins[college_id]
+        else:
+            written_pins.pop(college_id, None)
+        _write_layout(root, layout)
+        _clear_college(store.stores[source], college_id)
+        moved.append(college_id)
+        if verbose:
+            print(f"  ✓ {college_id}: shard {source} -> {target}")
+    return moved
+
+
+def reshard(source, target, verbose=True):
+    """
+    Copy every college from source into target (any two stores, e.g. the unsharded
+    store into a new ShardedCampusStore), skipping (collection, college) pairs that
+    target already holds in full
+
+    A pair the target holds only part of (an interrupted copy) is cleared and
+    copied again.
+
+    Returns:
+        dict collection -> number of records copied
+    """
+    copied = {}
+    for collection in COLLECTIONS:
+        copied[collection] = 0
+        for college_id in source.colleges(collection):
+            existing = target.count(collection, college_id)
+            if existing == source.count(collection, college_id):
+                continue
+            if existing:
+                _clear(target, collection, college_id)
+            records = list(source.iter_records(collection, college_id))
+            target.insert_many(collection, college_id, records)
+            copied[collection] += len(records)
+            if verbose:
+                print(f"  ✓ {collection}/{college_id}: {len(records)} records")
+    return copied
+
+
+def open_sharded_campus_store(data_dir=DEFAULT_DATA_DIR, shards=4, backend=None, cache=None):
+    """
+    Open the sharded layout, first moving the data to match the requested shard count and pins
+
+    shards/layout.json records the shard count and pins the data was written
+    with. Without one, the unsharded store in data_dir is imported. When the
+    count differs, every college is copied from the recorded layout into the
+    new one and the old shard directories are retired. When only
+    shard_map.json changed, the colleges whose shard changed are moved. Each
+    step is recorded in the layout file, so an interrupted migration resumes
+    on the next start.
+    """
+    root = os.path.join(data_dir, SHARDS_DIR)
+    pins = load_pins(data_dir, shards)
+    # Several server workers start at once; the first migrates, the others find it done
+    with _layout_lock(root):
+        layout = _read_layout(root)
+        if layout is None:
+            counts = _existing_shard_counts(root)
+            if len(counts) > 1:
+                raise ValueError(f"{root} holds layouts for {counts} shards and no {LAYOUT_FILE}; "
+                                 f"retire all but the current one")
+            if counts:
+                # Shards created before layout.json existed: assume the current pins were used
+                layout = {"shards": counts[0], "pins": {c: s for c, s in pins.items() if s < counts[0]}}
+            else:
+                layout = {"shards": shards, "pins": pins, "pending": {"import": True}}
+            _write_layout(root, layout)
+
+        pending = layout.get("pending")
+        if pending is None and layout["shards"] != shards:
+            # Shards left behind for this count by an earlier layout would mix with the migrated data
+            _retire(data_dir, shards)
+            pending = {"shards": layout["shards"], "pins": layout["pins"]}
+            layout = {"shards": shards, "pins": pins, "pending": pending}
+            _write_layout(root, layout)
+
+        store = ShardedCampusStore(data_dir, shards, backend=backend, cache=cache, pins=pins)
+        if pending is not None:
+            # Safe to repeat after a crash: pairs the target holds in full are skipped and
+            # partly copied ones are cleared and copied again
+            if pending.get("import"):
+                source = open_campus_store(data_dir, backend=backend, cache=False)
+            else:
+                source = ShardedCampusStore(data_dir, pending["shards"], backend=backend, cache=False,
+                                            pins=pending["pins"])
+            copied = reshard(source, store, verbose=False)
+            if hasattr(source, "close"):
+                source.close()
+            if pending.get("import"):
+                if any(copied.values()):
+                    print(f"✓ Imported campus data into {shards} shards: {copied}")
+            else:
+                retired = _retire(data_dir, pending["shards"])
+                print(f"✓ Resharded campus data from {pending['shards']} to {shards} shards: {copied} "
+                      f"(old shards kept in {retired})")
+            layout = {"shards": shards, "pins": pins}
+            _write_layout(root, layout)
+
+        moved = _move_repinned(store, root, layout, verbose=False)
+        if moved:
+            print(f"✓ Moved {len(moved)} colleges to their newly pinned shards: {', '.join(moved)}")
+    return store
+
+
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+    import threading
+
+    print("="*80)
+    print("SHARDING BENCHMARK: concurrent writes from 8 colleges, 1 shard vs 8 shards")
+    print("="*80)
+
+    def problem(college, i):
+        return {"id": f"{college}-{i}", "title": "Projector not working", "description": "Lab 3",
+                "category": "Infrastructure", "severity": "Medium", "status": "Open", "upvotes": 0}
+
+    colleges = [f"college{i}" for i in range(8)]
+    print(f"\n{'shards':>6s} {'writes/s':>10s}")
+    print("-"*80)
+    for shards in (1, 8):
+        directory = tempfile.mkdtemp()
+        store = ShardedCampusStore(directory, shards, backend='sqlite', cache=False)
+
+        def write(college):
+            for i in range(300):
+                store.insert("problems", college, problem(college, i))
+
+        threads = [threading.Thread(target=write, args=(c,)) for c in colleges]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        print(f"{shards:6d} {len(colleges) * 300 / elapsed:10.0f}")
+        if shards == 8:
+            for shard in store.shard_stats():
+                print(f"  shard {shard['shard']}: {shard['colleges']} colleges, {shard['records']['problems']} problems")
+        shutil.rmtree(directory)
@@ -0,0 +1,710 @@
+"""
+Campus Store
+Storage backends for the per-college problems, wisdom and alerts collections
+"""
+
+import os
+import glob
+import json
+import base64
+import sqlite3
+import threading
+
+COLLECTIONS = ['problems', 'wisdom', 'alerts']
+
+# Indexed column -> record field it is copied from, per collection
+INDEXED_FIELDS = {
+    'problems': {'category': 'category', 'status': 'status', 'severity': 'severity', 'date': 'reportedDate', 'upvotes': 'upvotes'},
+    'wisdom': {'category': 'category', 'date': 'date', 'upvotes': 'upvotes'},
+    'alerts': {'category': 'category', 'severity': 'severity', 'date': 'predictedDate'},
+}
+INDEXED_COLUMNS = ['category', 'status', 'severity', 'date', 'upvotes']
+
+# Sortable columns and the value a record without the field sorts as
+SORT_DEFAULTS = {'upvotes': 0, 'date': ''}
+# Equality filters; dates are filtered with date_from / date_to (inclusive, YYYY-MM-DD)
+FILTER_COLUMNS = ['category', 'status', 'severity']
+
+DEFAULT_DATA_DIR = "campus_data"
+DATABASE_FILE = "campus.db"
+
+
+def _check_collection(collection):
+    if collection not in COLLECTIONS:
+        raise ValueError(f"Unknown collection: {collection}")
+
+
+def encode_cursor(sort, order, key, seq):
+    """Opaque page cursor: the sort spec plus the (sort key, seq) of the last record returned"""
+    payload = json.dumps([sort, order, key, seq], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort, order):
+    """(sort key, seq) from a cursor; ValueError if it's malformed or from a different sort"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_order, key, seq = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise ValueError("Invalid cursor") from None
+    if (cursor_sort, cursor_order) != (sort, order if sort else None):
+        raise ValueError("Cursor was issued for a different sort order")
+    return key, seq
+
+
+def _field_value(collection, record, column):
+    field = INDEXED_FIELDS[collection].get(column)
+    value = record.get(field) if field else None
+    if value is None and column in SORT_DEFAULTS:
+        return SORT_DEFAULTS[column]
+    return value
+
+
+def query_records(collection, records, filters=None, sort=None, order='desc', limit=None, cursor=None, count=True):
+    """
+    Filter, sort and page an in-memory list of records (insertion order)
+
+    Same semantics as SqliteCampusStore.query, for the backends that already
+    hold a college's records in memory. A record's position in the list stands
+    in for seq, so a page boundary can shift if records are deleted between
+    requests.
+
+    Returns:
+        (page of records, total matching records or None without count, next cursor or None)
+    """
+    filters = filters or {}
+    matches = []
+    for seq, record in enumerate(records):
+        if any(filters.get(column) is not None and _field_value(collection, record, column) != filters[column]
+               for column in FILTER_COLUMNS):
+            continue
+        date = _field_value(collection, record, 'date')
+        if filters.get('date_from') is not None and date < filters['date_from']:
+            continue
+        if filters.get('date_to') is not None and date > filters['date_to']:
+            continue
+        key = _field_value(collection, record, sort) if sort else None
+        matches.append((key, seq, record))
+
+    descending = sort is not None and order == 'desc'
+    if sort:
+        matches.sort(key=lambda m: (m[0], m[1]), reverse=descending)
+    total = len(matches) if count else None
+
+    if cursor is not None:
+        key, seq = decode_cursor(cursor, sort, order)
+        position = (key, seq) if sort else (None, seq)
+        if descending:
+            matches = [m for m in matches if (m[0], m[1]) < position]
+        else:
+            matches = [m for m in matches if (m[0], m[1]) > position]
+
+    next_cursor = None
+    if limit is not None and len(matches) > limit:
+        matches = matches[:limit]
+        last_key, last_seq, _ = matches[-1]
+        next_cursor = encode_cursor(sort, order if sort else None, last_key, last_seq)
+    return [m[2] for m in matches], total, next_cursor
+
+
+def _file_stamp(path):
+    """(mtime, size) of a file, or None when it doesn't exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class JsonCampusStore:
+    """
+    One JSON file per (collection, college), e.g. campus_data/problems_{college}.json
+
+    Every write reads and rewrites the whole file; kept for small deployments and
+    as the source format for migrate_json_to_sqlite.
+    """
+
+    backend = 'json'
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR):
+        self.data_dir = data_dir
+        os.makedirs(data_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, collection, college_id):
+        _check_collection(collection)
+        return os.path.join(self.data_dir, f"{collection}_{college_id}.json")
+
+    def _load(self, collection, college_id):
+        path = self._path(collection, college_id)
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                return json.load(f)
+        return []
+
+    def _save(self, collection, college_id, records):
+        with open(self._path(collection, college_id), 'w') as f:
+            json.dump(records, f, indent=2)
+
+    def version_token(self, collection, college_id):
+        """Changes whenever the collection's file is rewritten"""
+        return _file_stamp(self._path(collection, college_id))
+
+    def list(self, collection, college_id, category=None):
+        records = self._load(collection, college_id)
+        if category is not None:
+            records = [r for r in records if r.get("category") == category]
+        return records
+
+    def query(self, collection, college_id, filters=None, sort=None, order='desc', limit=None, cursor=None,
+              count=True):
+        return query_records(collection, self._load(collection, college_id), filters, sort, order, limit, cursor, count)
+
+    def iter_records(self, collection, college_id, batch_size=500):
+        """Every record in insertion order (the file is parsed whole; use SQLite for very large exports)"""
+        yield from self._load(collection, college_id)
+
+    def insert(self, collection, college_id, record):
+        self.insert_many(collection, college_id, [record])
+        return record
+
+    def insert_many(self, collection, college_id, records):
+        with self._lock:
+            existing = self._load(collection, college_id)
+            existing.extend(records)
+            self._save(collection, college_id, existing)
+        return len(records)
+
+    def update(self, collection, college_id, record_id, record):
+        """Replace the first record with this id; returns the replaced record, or None when there is none"""
+        with self._lock:
+            records = self._load(collection, college_id)
+            for i, r in enumerate(records):
+                if r["id"] == record_id:
+                    records[i] = record
+                    self._save(collection, college_id, records)
+                    return r
+        return None
+
+    def update_many(self, collection, college_id, records):
+        """Apply update() for each record (by its id) with one file rewrite; returns the replaced records"""
+        with self._lock:
+            existing = self._load(collection, college_id)
+            positions = {}
+            for i, r in enumerate(existing):
+                positions.setdefault(r["id"], i)
+            replaced = []
+            for record in records:
+                i = positions.get(record["id"])
+                replaced.append(existing[i] if i is not None else None)
+                if i is not None:
+                    existing[i] = record
+            if any(r is not None for r in replaced):
+                self._save(collection, college_id, existing)
+        return replaced
+
+    def delete(self, collection, college_id, record_id):
+        """Remove every record with this id; returns the removed records"""
+        with self._lock:
+            records = self._load(collection, college_id)
+            kept = [r for r in records if r["id"] != record_id]
+            if len(kept) < len(records):
+                self._save(collection, college_id, kept)
+        return [r for r in records if r["id"] == record_id]
+
+    def count(self, collection, college_id):
+        return len(self._load(collection, college_id))
+
+    def colleges(self, collection):
+        """College ids that have a file for this collection"""
+        prefix = os.path.join(self.data_dir, f"{collection}_")
+        return sorted(path[len(prefix):-len(".json")] for path in glob.glob(f"{prefix}*.json"))
+
+
+class SqliteCampusStore:
+    """
+    All collections in one embedded SQLite database (WAL mode)
+
+    Each collection is a table holding the record as JSON plus copies of the
+    fields used for lookups, indexed per college on each filter and sort column.
+    Rows keep insertion order, so list() returns what the JSON files did, and
+    writes touch one row instead of rewriting a whole file. WAL lets readers
+    proceed while a write commits; each thread uses its own connection. Triggers
+    keep a per-(collection, college) change counter that serves as the version
+    token, so a write by any process or tool invalidates exactly the lists it
+    changed.
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, path=os.path.join(DEFAULT_DATA_DIR, DATABASE_FILE)):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._init_schema()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._connection()
+        with conn:
+            for collection in COLLECTIONS:
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {collection} (
+                        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                        college TEXT NOT NULL,
+                        id TEXT NOT NULL,
+                        category TEXT,
+                        status TEXT,
+                        severity TEXT,
+                        date TEXT,
+                        upvotes INTEGER,
+                        data TEXT NOT NULL
+                    )
+                """)
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {collection}_college_id ON {collection} (college, id)")
+                # Every SQLite index ends with the rowid (seq), so (college, X) also orders ties by seq
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {collection}_college ON {collection} (college)")
+                for column in ('category', 'status', 'severity', 'date', 'upvotes'):
+                    conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {collection}_college_{column} "
+                        f"ON {collection} (college, {column})"
+                    )
+                # Sort columns are never NULL so keyset comparisons stay simple
+                for column, default in SORT_DEFAULTS.items():
+                    conn.execute(f"UPDATE {collection} SET {column} = ? WHERE {column} IS NULL", (default,))
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS collection_versions (
+                    collection TEXT NOT NULL,
+                    college TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    PRIMARY KEY (collection, college)
+                )
+            """)
+            # Triggers bump the counter inside the writing transaction, whoever the writer is
+            for collection in COLLECTIONS:
+                for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+                    conn.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS {collection}_version_{event.lower()}
+                        AFTER {event} ON {collection} BEGIN
+                            INSERT INTO collection_versions (collection, college, version)
+                            VALUES ('{collection}', {row}.college, 1)
+                            ON CONFLICT (collection, college) DO UPDATE SET version = version + 1;
+                        END
+                    """)
+
+    def version_token(self, collection, college_id):
+        """Change counter of one college's collection, bumped by every write that commits"""
+        row = self._connection().execute(
+            "SELECT version FROM collection_versions WHERE collection = ? AND college = ?", (collection, college_id)
+        ).fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _columns(collection, record):
+        return [_field_value(collection, record, column) for column in INDEXED_COLUMNS]
+
+    def query(self, collection, college_id, filters=None, sort=None, order='desc', limit=None, cursor=None,
+              count=True):
+        """
+        One page of a college's records, filtered and sorted with the indexes
+
+        Args:
+            filters: dict with any of category, status, severity, date_from, date_to
+            sort: None (insertion order), 'upvotes' or 'date'
+            order: 'desc' or 'asc' (ignored without sort)
+            limit: page size, None for every match
+            cursor: next_cursor from the previous page
+            count: False skips the COUNT(*), which reads every match; total is then None
+
+        Returns:
+            (page of records, total matching records or None, next cursor or None)
+        """
+        _check_collection(collection)
+        if sort is not None and sort not in SORT_DEFAULTS:
+            raise ValueError(f"Cannot sort by {sort}")
+        filters = filters or {}
+        where, params = ["college = ?"], [college_id]
+        for column in FILTER_COLUMNS:
+            if filters.get(column) is not None:
+                where.append(f"{column} = ?")
+                params.append(filters[column])
+        if filters.get('date_from') is not None:
+            where.append("date >= ?")
+            params.append(filters['date_from'])
+        if filters.get('date_to') is not None:
+            where.append("date <= ?")
+            params.append(filters['date_to'])
+
+        conn = self._connection()
+        total = None
+        if count:
+            (total,) = conn.execute(f"SELECT COUNT(*) FROM {collection} WHERE {' AND '.join(where)}", params).fetchone()
+
+        descending = sort is not None and order == 'desc'
+        direction = "DESC" if descending else "ASC"
+        if cursor is not None:
+            key, seq = decode_cursor(cursor, sort, order)
+            comparison = "<" if descending else ">"
+            if sort:
+                where.append(f"({sort}, seq) {comparison} (?, ?)")
+                params.extend([key, seq])
+            else:
+                where.append("seq > ?")
+                params.append(seq)
+
+        order_by = f"{sort} {direction}, seq {direction}" if sort else "seq"
+        query = f"SELECT seq, {sort or 'NULL'}, data FROM {collection} WHERE {' AND '.join(where)} ORDER BY {order_by}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit + 1)
+        rows = conn.execute(query, params).fetchall()
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(sort, order if sort else None, rows[-1][1], rows[-1][0])
+        return [json.loads(data) for _, _, data in rows], total, next_cursor
+
+    def iter_records(self, collection, college_id, batch_size=500):
+        """
+        Every record in insertion order, read batch_size rows at a time
+
+        Each batch is its own keyset query (seq > last seen), so memory stays flat,
+        no read transaction is held between batches, and the generator may be
+        resumed from any thread.
+        """
+        _check_collection(collection)
+        last_seq = 0
+        while True:
+            rows = self._connection().execute(
+                f"SELECT seq, data FROM {collection} WHERE college = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (college_id, last_seq, batch_size)
+            ).fetchall()
+            for _, data in rows:
+                yield json.loads(data)
+            if len(rows) < batch_size:
+                return
+            last_seq = rows[-1][0]
+
+    def list(self, collection, college_id, category=None):
+        _check_collection(collection)
+        query = f"SELECT data FROM {collection} WHERE college = ?"
+        params = [college_id]
+        if category is not None:
+            query += " AND category = ?"
+            params.append(category)
+        rows = self._connection().execute(query + " ORDER BY seq", params).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def insert(self, collection, college_id, record):
+        self.insert_many(collection, college_id, [record])
+        return record
+
+    def insert_many(self, collection, college_id, records):
+        """Insert records in one transaction"""
+        _check_collection(collection)
+        placeholders = ", ".join("?" * (len(INDEXED_COLUMNS) + 3))
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                f"INSERT INTO {collection} (college, id, {', '.join(INDEXED_COLUMNS)}, data) VALUES ({placeholders})",
+                [
+                    [college_id, record["id"]] + self._columns(collection, record) + [json.dumps(record)]
+                    for record in records
+                ]
+            )
+        return len(records)
+
+    def update(self, collection, college_id, record_id, record):
+        """Replace the first record with this id; returns the replaced record, or None when there is none"""
+        _check_collection(collection)
+        assignments = ", ".join(f"{column} = ?" for column in INDEXED_COLUMNS)
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                f"SELECT seq, data FROM {collection} WHERE college = ? AND id = ? ORDER BY seq LIMIT 1",
+                (college_id, record_id)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                f"UPDATE {collection} SET id = ?, {assignments}, data = ? WHERE seq = ?",
+                [record["id"]] + self._columns(collection, record) + [json.dumps(record), row[0]]
+            )
+        return json.loads(row[1])
+
+    def update_many(self, collection, college_id, records):
+        """Apply update() for each record (by its id) in one transaction; returns the replaced records"""
+        _check_collection(collection)
+        assignments = ", ".join(f"{column} = ?" for column in INDEXED_COLUMNS)
+        conn = self._connection()
+        replaced = []
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for record in records:
+                row = conn.execute(
+                    f"SELECT seq, data FROM {collection} WHERE college = ? AND id = ? ORDER BY seq LIMIT 1",
+                    (college_id, record["id"])
+                ).fetchone()
+                if row is None:
+                    replaced.append(None)
+                    continue
+                conn.execute(
+                    f"UPDATE {collection} SET {assignments}, data = ? WHERE seq = ?",
+                    self._columns(collection, record) + [json.dumps(record), row[0]]
+                )
+                replaced.append(json.loads(row[1]))
+        return replaced
+
+    def delete(self, collection, college_id, record_id):
+        """Remove every record with this id; returns the removed records"""
+        _check_collection(collection)
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                f"SELECT data FROM {collection} WHERE college = ? AND id = ? ORDER BY seq", (college_id, record_id)
+            ).fetchall()
+            if rows:
+                conn.execute(f"DELETE FROM {collection} WHERE college = ? AND id = ?", (college_id, record_id))
+            return [json.loads(data) for (data,) in rows]
+
+    def count(self, collection, college_id):
+        _check_collection(collection)
+        (total,) = self._connection().execute(
+            f"SELECT COUNT(*) FROM {collection} WHERE college = ?", (college_id,)
+        ).fetchone()
+        return total
+
+    def colleges(self, collection):
+        _check_collection(collection)
+        rows = self._connection().execute(f"SELECT DISTINCT college FROM {collection} ORDER BY college").fetchall()
+        return [college for (college,) in rows]
+
+
+class CachedCampusStore:
+    """
+    Read-through cache of parsed collections, one list per (collection, college)
+
+    Reads are served from memory after the first load. Writes go to the wrapped
+    store and are applied to the cached list in place, so steady-state reads
+    never re-read or re-parse data. Changes made outside this process are
+    caught by the store's version token (file mtime and size, or SQLite's
+    change counters): a mismatch on read reloads the entry.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.backend = store.backend
+        self._entries = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name):
+        # Anything not cached (count, colleges, insert_many, ...) goes straight to the store
+        return getattr(self.store, name)
+
+    def _records(self, collection, college_id):
+        key = (collection, college_id)
+        token = self.store.version_token(collection, college_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == token:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            records = self.store.list(collection, college_id)
+            self._entries[key] = (token, records)
+            return records
+
+    def list(self, collection, college_id, category=None):
+        records = self._records(collection, college_id)
+        if category is not None:
+            return [r for r in records if r.get("category") == category]
+        return list(records)
+
+    def query(self, collection, college_id, filters=None, sort=None, order='desc', limit=None, cursor=None,
+              count=True):
+        # Pages come from SQLite's indexes; anything that needs every match is served from the cache
+        if limit is not None and hasattr(self.store, 'query') and self.store.backend == 'sqlite':
+            return self.store.query(collection, college_id, filters, sort, order, limit, cursor, count)
+        return query_records(collection, self._records(collection, college_id), filters, sort, order, limit, cursor, count)
+
+    def _write(self, collection, college_id, write, apply):
+        """Run write() on the store, then apply(cached records) if the entry was current"""
+        key = (collection, college_id)
+        with self._lock:
+            before = self.store.version_token(collection, college_id)
+            result = write()
+            after = self.store.version_token(collection, college_id)
+
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == before:
+                apply(entry[1], result)
+                self._entries[key] = (after, entry[1])
+            else:
+                self._entries.pop(key, None)
+            return result
+
+    def insert(self, collection, college_id, record):
+        return self._write(
+            collection, college_id,
+            lambda: self.store.insert(collection, college_id, record),
+            lambda records, _: records.append(record)
+        )
+
+    def insert_many(self, collection, college_id, records):
+        return self._write(
+            collection, college_id,
+            lambda: self.store.insert_many(collection, college_id, records),
+            lambda cached, _: cached.extend(records)
+        )
+
+    def update(self, collection, college_id, record_id, record):
+        def apply(records, updated):
+            if updated:
+                for i, r in enumerate(records):
+                    if r["id"] == record_id:
+                        records[i] = record
+                        break
+        return self._write(
+            collection, college_id,
+            lambda: self.store.update(collection, college_id, record_id, record),
+            apply
+        )
+
+    def update_many(self, collection, college_id, records):
+        def apply(cached, replaced):
+            positions = {}
+            for i, r in enumerate(cached):
+                positions.setdefault(r["id"], i)
+            for record, old in zip(records, replaced):
+                if old is not None:
+                    cached[positions[record["id"]]] = record
+        return self._write(
+            collection, college_id,
+            lambda: self.store.update_many(collection, college_id, records),
+            apply
+        )
+
+    def delete(self, collection, college_id, record_id):
+        def apply(records, removed):
+            if removed:
+                records[:] = [r for r in records if r["id"] != record_id]
+        return self._write(
+            collection, college_id,
+            lambda: self.store.delete(collection, college_id, record_id),
+            apply
+        )
+
+    def invalidate(self, collection=None, college_id=None):
+        """Drop cached entries (all of them by default)"""
+        with self._lock:
+            for key in list(self._entries):
+                if (collection is None or key[0] == collection) and (college_id is None or key[1] == college_id):
+                    del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.backend,
+                'cached_collections': len(self._entries),
+                'cached_records': sum(len(records) for _, records in self._entries.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+def migrate_json_to_sqlite(data_dir=DEFAULT_DATA_DIR, store=None, verbose=True):
+    """
+    Import every problems_/wisdom_/alerts_{college}.json file into SQLite
+    (or into store, which may be any backend)
+
+    A (collection, college) pair that already has rows in the database is
+    skipped, so running the migration again never duplicates records.
+
+    Returns:
+        dict collection -> number of records imported
+    """
+    source = JsonCampusStore(data_dir)
+    store = store or SqliteCampusStore(os.path.join(data_dir, DATABASE_FILE))
+    imported = {}
+    for collection in COLLECTIONS:
+        imported[collection] = 0
+        for college_id in source.colleges(collection):
+            if store.count(collection, college_id):
+                if verbose:
+                    print(f"  - {collection}/{college_id}: already in database, skipped")
+                continue
+            records = source.list(collection, college_id)
+            store.insert_many(collection, college_id, records)
+            imported[collection] += len(records)
+            if verbose:
+                print(f"  ✓ {collection}/{college_id}: {len(records)} records")
+    return imported
+
+
+def open_campus_store(data_dir=DEFAULT_DATA_DIR, backend=None, cache=None):
+    """
+    Open the configured store (CAMPUS_STORE_BACKEND = sqlite | json | log, default sqlite)
+
+    A new SQLite database or log store imports any existing JSON collection files on creation.
+    The store is wrapped in a CachedCampusStore unless cache is False
+    (or CAMPUS_STORE_CACHE=0).
+    """
+    backend = backend or os.environ.get("CAMPUS_STORE_BACKEND", "sqlite")
+    if backend == 'log':
+        # Already served from memory, so it doesn't need the cache
+        from campus_log_store import LogCampusStore
+        store = LogCampusStore(data_dir)
+        if store.is_new:
+            imported = migrate_json_to_sqlite(data_dir, store, verbose=False)
+            if any(imported.values()):
+                print(f"✓ Imported JSON campus data into {store.directory}: {imported}")
+        return store
+
+    if cache is None:
+        cache = os.environ.get("CAMPUS_STORE_CACHE", "1") != "0"
+
+    if backend == 'json':
+        store = JsonCampusStore(data_dir)
+    elif backend == 'sqlite':
+        path = os.path.join(data_dir, DATABASE_FILE)
+        is_new = not os.path.exists(path)
+        store = SqliteCampusStore(path)
+        if is_new:
+            imported = migrate_json_to_sqlite(data_dir, store, verbose=False)
+            if any(imported.values()):
+                print(f"✓ Imported JSON campus data into {path}: {imported}")
+    else:
+        raise ValueError(f"Unknown campus store backend: {backend}")
+
+    return CachedCampusStore(store) if cache else store
+
+
+if __name__ == "__main__":
+    import sys
+
+    print("="*80)
+    print("CAMPUS DATA MIGRATION: JSON files -> SQLite")
+    print("="*80)
+
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DATA_DIR
+    database = os.path.join(data_dir, DATABASE_FILE)
+    print(f"Source : {data_dir}/{{problems,wisdom,alerts}}_<college>.json")
+    print(f"Target : {database}\n")
+
+    imported = migrate_json_to_sqlite(data_dir)
+    print(f"\n✅ Migration complete: {sum(imported.values())} records imported {imported}")
@@ -0,0 +1,107 @@
+"""
+Cohort Table
+Precomputed mean past ratings per student cohort, used as past_feedback for predictions
+"""
+
+import threading
+import numpy as np
+
+# Ratings passed to the recommender as past_feedback, in feature order
+FEEDBACK_COLUMNS = [
+    'venue_rating', 'organization_rating', 'content_quality', 'mentor_support',
+    'food_quality', 'prize_satisfaction', 'networking_opportunities', 'time_management',
+    'infrastructure', 'registration_process', 'learning_outcome'
+]
+
+# Back-off hierarchy, most specific first; the empty tuple is the global mean
+COHORT_LEVELS = [
+    ('student_branch', 'student_year', 'skill_level'),
+    ('student_branch', 'skill_level'),
+    ('skill_level',),
+    (),
+]
+
+# Minimum number of feedback rows before a cohort's means are trusted
+MIN_SUPPORT = 30
+
+
+class CohortMeanTable:
+    """
+    Cohort -> mean of the eleven feedback ratings as a NumPy row, with back-off
+
+    Means are kept for every level of COHORT_LEVELS, from (branch, year, skill_level)
+    down to the global mean. A lookup walks the levels and returns the first cohort
+    with at least min_support rows, so it is O(depth) and never touches the raw data.
+    Built with one groupby per level; appended feedback only touches its own cohorts.
+    """
+
+    def __init__(self, df=None, min_support=MIN_SUPPORT):
+        self.min_support = min_support
+        self._sums = [{} for _ in COHORT_LEVELS]
+        self._counts = [{} for _ in COHORT_LEVELS]
+        self._rows = [{} for _ in COHORT_LEVELS]
+        self._means = [{} for _ in COHORT_LEVELS]
+        self._lock = threading.Lock()
+        if df is not None:
+            self.add_batch(df)
+
+    def add_batch(self, batch):
+        """Fold feedback rows into the running sums and refresh the affected cohort means"""
+        if len(batch) == 0:
+            return
+        for level, columns in enumerate(COHORT_LEVELS):
+            if columns:
+                grouped = batch.groupby(list(columns))
+                sums = grouped[FEEDBACK_COLUMNS].sum()
+                counts = grouped[FEEDBACK_COLUMNS].count()
+                keys = [key if isinstance(key, tuple) else (key,) for key in sums.index]
+                updates = zip(keys, sums.to_numpy(), counts.to_numpy(), grouped.size().to_numpy())
+            else:
+                values = batch[FEEDBACK_COLUMNS]
+                updates = [((), values.sum().to_numpy(), values.count().to_numpy(), len(batch))]
+            with self._lock:
+                self._fold(level, updates)
+
+    def _fold(self, level, updates):
+        sums, counts, rows, means = self._sums[level], self._counts[level], self._rows[level], self._means[level]
+        for key, row_sum, row_count, size in updates:
+            if key in sums:
+                row_sum = row_sum + sums[key]
+                row_count = row_count + counts[key]
+                size = size + rows[key]
+            sums[key] = row_sum
+            counts[key] = row_count
+            rows[key] = int(size)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means[key] = row_sum / row_count
+
+    def resolve(self, branch, year, skill_level):
+        """
+        Find the most specific cohort with enough support
+
+        Returns:
+            (level columns, row count, mean ratings row), or None when there is no data at all
+        """
+        profile = {'student_branch': branch, 'student_year': year, 'skill_level': skill_level}
+        for level, columns in enumerate(COHORT_LEVELS):
+            key = tuple(profile[col] for col in columns)
+            size = self._rows[level].get(key, 0)
+            # The global level is the last resort and is used whenever it has any data
+            if size >= self.min_support or (not columns and size > 0):
+                return columns, size, self._means[level][key]
+        return None
+
+    def lookup(self, branch, year, skill_level):
+        """Mean ratings row for the best-supported cohort, or None when there is no data"""
+        resolved = self.resolve(branch, year, skill_level)
+        return resolved[2] if resolved is not None else None
+
+    def past_feedback(self, branch, year, skill_level):
+        """Mean ratings for the cohort as the past_feedback dict the recommender expects"""
+        row = self.lookup(branch, year, skill_level)
+        if row is None:
+            return None
+        return dict(zip(FEEDBACK_COLUMNS, row))
+
+    def __len__(self):
+        return len(self._means[0])
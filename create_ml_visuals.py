@@ -8,10 +8,11 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 import warnings
+from dataset_cache import load_feedback_dataset
 warnings.filterwarnings('ignore')
 
 print("Loading dataset and training ML model...")
-df = pd.read_csv('event_feedback_dataset.csv')
+df = load_feedback_dataset('event_feedback_dataset.csv')
 
 # Prepare data for ML model
 print("Preparing features...")
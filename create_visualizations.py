@@ -4,6 +4,7 @@ import seaborn as sns
 import numpy as np
 from collections import Counter
 import warnings
+from dataset_cache import load_feedback_dataset
 warnings.filterwarnings('ignore')
 
 # Set style for professional looking graphs
@@ -14,7 +15,7 @@ plt.rcParams['font.size'] = 11
 
 # Load the dataset
 print("Loading dataset...")
-df = pd.read_csv('event_feedback_dataset.csv')
+df = load_feedback_dataset('event_feedback_dataset.csv')
 print(f"Loaded {len(df):,} records\n")
 
 # Create output directory for images
@@ -0,0 +1,246 @@
+"""
+Dataset Cache
+Binary columnar cache for the event feedback dataset so services skip CSV parsing on startup
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+
+DATASET_FILE = 'event_feedback_dataset.csv'
+CACHE_FORMAT_VERSION = 2
+MANIFEST_FILE = 'manifest.json'
+# Name of the published version directory inside the cache directory
+CURRENT_FILE = 'CURRENT'
+# Unpublished version directories this old are leftovers of replaced or crashed builds
+STALE_VERSION_SECONDS = 600
+
+
+def _cache_dir_for(csv_path):
+    """Cache directory that sits next to the CSV, one per dataset file"""
+    directory, filename = os.path.split(os.path.abspath(csv_path))
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, '.dataset_cache', stem)
+
+
+def _file_sha256(path, chunk_size=1 << 20):
+    """Stream the file through SHA-256 without reading it into memory at once"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(path, text):
+    # Per-process scratch name, so concurrent writers never share a temp file
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _read_manifest(cache_dir):
+    """Manifest of the published cache version, or None when there is none"""
+    try:
+        with open(os.path.join(cache_dir, CURRENT_FILE), 'r') as f:
+            version = f.read().strip()
+        with open(os.path.join(cache_dir, version, MANIFEST_FILE), 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == version else None
+
+
+def _write_manifest(cache_dir, manifest):
+    path = os.path.join(cache_dir, manifest['version'], MANIFEST_FILE)
+    _write_atomic(path, json.dumps(manifest, indent=2))
+
+
+def _remove_stale_versions(cache_dir, keep):
+    """
+    Delete version directories nobody points at any more
+
+    Only directories untouched for STALE_VERSION_SECONDS go, so a build that
+    another process has not published yet, or a version a reader has only
+    just looked up, is left alone.
+    """
+    now = time.time()
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name == MANIFEST_FILE or name.endswith('.npy'):
+            # Files of the unversioned format 1 layout
+            os.remove(path)
+            continue
+        if name == keep or not name.startswith('v-') or not os.path.isdir(path):
+            continue
+        try:
+            if now - os.stat(path).st_mtime > STALE_VERSION_SECONDS:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+def _manifest_is_current(manifest, csv_path, cache_dir):
+    """
+    Check a manifest against the CSV on disk
+
+    The cheap mtime/size check is tried first. When it fails the file is hashed,
+    so a touched-but-unchanged CSV keeps its cache (the manifest is refreshed).
+    """
+    if manifest is None:
+        return False
+    if manifest.get('format_version') != CACHE_FORMAT_VERSION:
+        return False
+    if manifest.get('pandas_version') != pd.__version__:
+        return False
+
+    stat = os.stat(csv_path)
+    if manifest.get('mtime_ns') == stat.st_mtime_ns and manifest.get('size') == stat.st_size:
+        return True
+
+    if manifest.get('size') != stat.st_size:
+        return False
+    if _file_sha256(csv_path) != manifest.get('sha256'):
+        return False
+
+    manifest['mtime_ns'] = stat.st_mtime_ns
+    _write_manifest(cache_dir, manifest)
+    return True
+
+
+def build_dataset_cache(csv_path=DATASET_FILE, cache_dir=None):
+    """
+    Parse the CSV once and write it out as one .npy file per column
+
+    Numeric columns are stored as-is. Text columns are factorized into int32 codes
+    plus a fixed-width unicode array of categories (object arrays cannot be saved
+    without pickling). Missing values are kept as code -1.
+
+    Each build goes into its own version directory, published by atomically
+    replacing the CURRENT pointer file, so processes rebuilding at the same time
+    never delete or overwrite a cache another one is reading.
+
+    Returns:
+        The manifest describing the cache
+    """
+    cache_dir = cache_dir or _cache_dir_for(csv_path)
+    stat = os.stat(csv_path)
+    df = pd.read_csv(csv_path)
+
+    version = f"v-{time.time_ns()}-{os.getpid()}"
+    tmp_dir = os.path.join(cache_dir, version)
+    os.makedirs(tmp_dir)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        if series.dtype.kind in 'iufb':
+            np.save(os.path.join(tmp_dir, f'{i:03d}.npy'), series.to_numpy())
+            columns.append({'name': col, 'kind': 'numeric'})
+        else:
+            codes, uniques = pd.factorize(series)
+            np.save(os.path.join(tmp_dir, f'{i:03d}.npy'), codes.astype(np.int32))
+            np.save(os.path.join(tmp_dir, f'{i:03d}.categories.npy'), np.asarray(uniques, dtype=str))
+            columns.append({'name': col, 'kind': 'categorical', 'dtype': str(series.dtype)})
+
+    manifest = {
+        'format_version': CACHE_FORMAT_VERSION,
+        'version': version,
+        'pandas_version': pd.__version__,
+        'source': os.path.abspath(csv_path),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': _file_sha256(csv_path),
+        'rows': len(df),
+        'columns': columns,
+    }
+    _write_manifest(cache_dir, manifest)
+
+    # Last writer wins; either way CURRENT names a complete version
+    _write_atomic(os.path.join(cache_dir, CURRENT_FILE), version)
+    _remove_stale_versions(cache_dir, keep=version)
+    return manifest
+
+
+def _load_from_cache(cache_dir, manifest):
+    """
+    Rebuild the DataFrame from the column files
+
+    Numeric columns stay memory-mapped. Text columns are decoded into object
+    arrays on the heap, so callers get the same dtypes as read_csv.
+    """
+    version_dir = os.path.join(cache_dir, manifest['version'])
+    data = {}
+    for i, column in enumerate(manifest['columns']):
+        values = np.load(os.path.join(version_dir, f'{i:03d}.npy'), mmap_mode='r')
+        if column['kind'] == 'categorical':
+            categories = np.load(os.path.join(version_dir, f'{i:03d}.categories.npy'))
+            codes = values
+            values = categories.astype(object).take(codes)
+            values[codes < 0] = np.nan
+            values = pd.array(values, dtype=column['dtype'])
+        data[column['name']] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def load_feedback_dataset(csv_path=DATASET_FILE, cache_dir=None, verbose=False):
+    """
+    Load the feedback dataset, going through the binary cache when possible
+
+    The cache is (re)built automatically when missing, or when the CSV's mtime/size
+    and content hash no longer match the manifest.
+
+    Args:
+        csv_path: path to the source CSV
+        cache_dir: override for the cache location (defaults to .dataset_cache/ next to the CSV)
+        verbose: print whether the cache was hit or rebuilt
+
+    Returns:
+        pandas DataFrame equivalent to pd.read_csv(csv_path)
+    """
+    cache_dir = cache_dir or _cache_dir_for(csv_path)
+    manifest = _read_manifest(cache_dir)
+
+    if not _manifest_is_current(manifest, csv_path, cache_dir):
+        if verbose:
+            print(f"Building binary cache for {csv_path}...")
+        manifest = build_dataset_cache(csv_path, cache_dir)
+    elif verbose:
+        print(f"✓ Using binary cache for {csv_path}")
+
+    try:
+        return _load_from_cache(cache_dir, manifest)
+    except FileNotFoundError:
+        # The version was replaced and cleaned up between reading CURRENT and loading
+        return _load_from_cache(cache_dir, build_dataset_cache(csv_path, cache_dir))
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    print("="*80)
+    print("DATASET CACHE")
+    print("="*80)
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DATASET_FILE
+
+    start = time.perf_counter()
+    pd.read_csv(csv_path)
+    csv_time = time.perf_counter() - start
+
+    manifest = build_dataset_cache(csv_path)
+    print(f"✓ Cache built: {manifest['rows']:,} rows, {len(manifest['columns'])} columns")
+    print(f"✓ Location: {_cache_dir_for(csv_path)}")
+
+    start = time.perf_counter()
+    load_feedback_dataset(csv_path)
+    cache_time = time.perf_counter() - start
+
+    print(f"\n  CSV parse  : {csv_time*1000:8.1f} ms")
+    print(f"  Cache load : {cache_time*1000:8.1f} ms")
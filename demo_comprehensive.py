@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 import joblib
 from recommendation_system import EventRecommendationSystem
+from dataset_cache import load_feedback_dataset
 
 print("="*80)
 print("EVENT FEEDBACK-BASED RECOMMENDATION SYSTEM")
@@ -12,7 +13,7 @@ print("="*80)
 recommender = EventRecommendationSystem()
 
 # Load the dataset to analyze real patterns
-df = pd.read_csv('event_feedback_dataset.csv')
+df = load_feedback_dataset('event_feedback_dataset.csv')
 
 print("\n" + "="*80)
 print("SCENARIO 1: Student with Past Event History")
@@ -3,19 +3,239 @@ Event Guidance System
 Provides recommendations and advice to students based on past event feedback
 """
 
+import threading
 import pandas as pd
 import numpy as np
+from itertools import combinations
 from collections import Counter
+from feedback_store import get_feedback_store, COHORT_COLUMNS
+from quantile_sketch import TDigest
 import warnings
 warnings.filterwarnings('ignore')
 
+# Columns whose running sums/counts are kept per event
+AGGREGATE_COLUMNS = [
+    'venue_rating', 'organization_rating', 'content_quality', 'mentor_support',
+    'food_quality', 'networking_opportunities', 'time_management', 'infrastructure',
+    'registration_process', 'learning_outcome', 'overall_satisfaction', 'would_recommend'
+]
+
+# Dataset column -> student profile key used to find similar students
+PROFILE_COLUMNS = {'student_branch': 'branch', 'student_year': 'year', 'skill_level': 'skill_level'}
+PROFILE_DEFAULTS = {'branch': '', 'year': 0, 'skill_level': ''}
+
+# Every non-empty combination of profile columns, for inclusion-exclusion over the OR match
+PROFILE_SUBSETS = [
+    cols for size in range(1, len(PROFILE_COLUMNS) + 1)
+    for cols in combinations(PROFILE_COLUMNS, size)
+]
+
+
+def _add(totals, key, value_sum, value_count):
+    """Accumulate a (sum, count) pair in a dict"""
+    current = totals.get(key)
+    if current is None:
+        totals[key] = [value_sum, value_count]
+    else:
+        current[0] += value_sum
+        current[1] += value_count
+
+
+def _mean(pair):
+    if pair is None or pair[1] == 0:
+        return np.nan
+    return pair[0] / pair[1]
+
+
+class EventAggregates:
+    """Running statistics for one event; guidance is computed from these instead of raw rows"""
+
+    def __init__(self, event_type, duration_days):
+        self.event_type = event_type
+        self.duration_days = duration_days
+        self.count = 0
+        self.columns = {col: [0.0, 0] for col in AGGREGATE_COLUMNS}
+        self.issue_counts = Counter()
+        self.satisfaction_sketch = TDigest()
+        self.team_satisfaction = {}
+        self.profile_satisfaction = {}
+
+        # Participants with satisfaction >= 8 who would recommend the event
+        self.success_count = 0
+        self.success_solo = 0
+        self.success_skills = {}
+        self.success_columns = {col: [0.0, 0] for col in ('content_quality', 'networking_opportunities')}
+        self.winner_learning = [0.0, 0]
+
+    def mean(self, col):
+        return _mean(self.columns[col])
+
+    def add_issues(self, values):
+        """Count issues the same way the raw-row analysis parsed issues_faced"""
+        for issues_str in values:
+            if issues_str and str(issues_str) != 'None' and str(issues_str) != 'nan':
+                self.issue_counts.update(issue.strip() for issue in str(issues_str).split(','))
+
+    def similar_students(self, student_profile):
+        """
+        Count and mean satisfaction of attendees sharing branch OR year OR skill level
+
+        Computed by inclusion-exclusion over the per-combination totals.
+        """
+        profile = {
+            col: student_profile.get(key, PROFILE_DEFAULTS[key])
+            for col, key in PROFILE_COLUMNS.items()
+        }
+        total_sum, total_count = 0.0, 0
+        for cols in PROFILE_SUBSETS:
+            pair = self.profile_satisfaction.get((cols, tuple(profile[c] for c in cols)))
+            if pair is None:
+                continue
+            sign = 1 if len(cols) % 2 else -1
+            total_sum += sign * pair[0]
+            total_count += sign * pair[1]
+        return total_count, (total_sum / total_count if total_count > 0 else np.nan)
+
+    def best_team_size(self):
+        """Team size with the highest mean satisfaction (smallest size wins ties)"""
+        best, best_mean = None, None
+        for size in sorted(self.team_satisfaction):
+            mean = _mean(self.team_satisfaction[size])
+            if best_mean is None or mean > best_mean:
+                best, best_mean = size, mean
+        return best
+
+    def top_success_skill(self):
+        """Most common skill level among successful participants (alphabetical on ties)"""
+        best, best_count = None, 0
+        for skill in sorted(self.success_skills):
+            if self.success_skills[skill] > best_count:
+                best, best_count = skill, self.success_skills[skill]
+        return best
+
+
 class EventGuidanceSystem:
-    def __init__(self):
-        """Initialize by loading historical feedback data"""
+    def __init__(self, store=None):
+        """
+        Initialize with historical feedback data
+
+        Args:
+            store: shared FeedbackStore (defaults to the process-wide store)
+        """
         print("Loading historical event feedback data...")
-        self.df = pd.read_csv('event_feedback_dataset.csv')
-        print(f"✓ Loaded {len(self.df):,} feedback records from past events\n")
-    
+        self.store = store if store is not None else get_feedback_store()
+        self.aggregates = {}
+        self.cohort_sketches = {}
+        self._lock = threading.RLock()
+        # Subscribe first: batches appended meanwhile arrive through the callback, not twice.
+        # (Not under self._lock, which append's callbacks take while holding the store lock.)
+        self._update_aggregates(self.store.subscribe(self._update_aggregates))
+        print(f"✓ Loaded {len(self.store):,} feedback records from past events\n")
+
+    @property
+    def df(self):
+        return self.store.df
+
+    def add_feedback(self, rows):
+        """
+        Ingest new feedback without reloading the dataset
+
+        Per-event aggregates are updated in O(rows added), so guidance reflects the
+        new rows immediately.
+
+        Args:
+            rows: one feedback dict, a list of them, or a DataFrame with dataset columns
+
+        Returns:
+            number of rows ingested
+        """
+        return len(self.store.append(rows))
+
+    def _update_aggregates(self, batch):
+        """Fold a batch of feedback rows into the per-event aggregates"""
+        with self._lock:
+            by_event = batch.groupby('event_name')
+            satisfaction = batch['overall_satisfaction'].to_numpy(dtype=float)
+
+            for event_name, positions in by_event.indices.items():
+                agg = self.aggregates.get(event_name)
+                if agg is None:
+                    first = batch.iloc[positions[0]]
+                    agg = self.aggregates[event_name] = EventAggregates(
+                        first['event_type'], first['event_duration_days']
+                    )
+                agg.count += len(positions)
+                agg.add_issues(batch['issues_faced'].to_numpy()[positions])
+                agg.satisfaction_sketch.add_many(satisfaction[positions])
+
+            for cohort, positions in batch.groupby(COHORT_COLUMNS).indices.items():
+                sketch = self.cohort_sketches.get(cohort)
+                if sketch is None:
+                    sketch = self.cohort_sketches[cohort] = TDigest()
+                sketch.add_many(satisfaction[positions])
+
+            sums = by_event[AGGREGATE_COLUMNS].sum()
+            counts = by_event[AGGREGATE_COLUMNS].count()
+            for event_name in sums.index:
+                agg = self.aggregates[event_name]
+                for col in AGGREGATE_COLUMNS:
+                    agg.columns[col][0] += sums.at[event_name, col]
+                    agg.columns[col][1] += int(counts.at[event_name, col])
+
+            team = batch.groupby(['event_name', 'team_size'])['overall_satisfaction'].agg(['sum', 'count'])
+            for (event_name, team_size), value_sum, value_count in zip(team.index, team['sum'], team['count']):
+                _add(self.aggregates[event_name].team_satisfaction, team_size, value_sum, int(value_count))
+
+            # Group once by the full profile, then roll each group up into every column combination
+            profile_columns = list(PROFILE_COLUMNS)
+            # dropna=False: a row missing one profile column still counts for the others
+            grouped = batch.groupby(['event_name', *profile_columns], dropna=False)['overall_satisfaction'].agg(['sum', 'count'])
+            for key, value_sum, value_count in zip(grouped.index, grouped['sum'], grouped['count']):
+                totals = self.aggregates[key[0]].profile_satisfaction
+                profile = {col: None if pd.isna(value) else value for col, value in zip(profile_columns, key[1:])}
+                for cols in PROFILE_SUBSETS:
+                    _add(totals, (cols, tuple(profile[c] for c in cols)), value_sum, int(value_count))
+
+            successful = batch[(batch['overall_satisfaction'] >= 8.0) & (batch['would_recommend'] == 1)]
+            for event_name, group in successful.groupby('event_name'):
+                agg = self.aggregates[event_name]
+                agg.success_count += len(group)
+                agg.success_solo += int((group['participated_alone'] == 1).sum())
+                for skill, size in group.groupby('skill_level').size().items():
+                    agg.success_skills[skill] = agg.success_skills.get(skill, 0) + int(size)
+                for col, pair in agg.success_columns.items():
+                    pair[0] += group[col].sum()
+                    pair[1] += int(group[col].count())
+                winners = group[group['achievement'].isin(['Won Prize', 'Runner Up'])]
+                agg.winner_learning[0] += winners['learning_outcome'].sum()
+                agg.winner_learning[1] += int(winners['learning_outcome'].count())
+
+    def satisfaction_range(self, event_name=None, cohort=None, lower=0.25, upper=0.75):
+        """
+        Approximate satisfaction quantile range from the streaming sketches
+
+        Args:
+            event_name: restrict to one event
+            cohort: (branch, year, skill_level) tuple to restrict to one student cohort
+            lower, upper: quantiles to return (default: interquartile range)
+
+        Returns:
+            (lower, upper) tuple, or None when there is no data for the selection
+        """
+        with self._lock:
+            if event_name is not None:
+                agg = self.aggregates.get(event_name)
+                sketch = agg.satisfaction_sketch if agg is not None else None
+            elif cohort is not None:
+                sketch = self.cohort_sketches.get(tuple(cohort))
+            else:
+                sketch = TDigest()
+                for agg in self.aggregates.values():
+                    sketch.merge(agg.satisfaction_sketch)
+            if sketch is None or sketch.count == 0:
+                return None
+            return sketch.range(lower, upper)
+
     def get_recommendations_for_registered_event(self, student_profile, event_name):
         """
         Provide comprehensive recommendations when student registers for an event
@@ -27,69 +247,96 @@ class EventGuidanceSystem:
         Returns:
             dict with recommendations, warnings, tips, and insights
         """
-        # Get all past feedback for this event
-        event_feedback = self.df[self.df['event_name'] == event_name]
-        
-        if len(event_feedback) == 0:
-            return {"error": f"No historical data found for {event_name}"}
-        
-        # Get feedback from similar students
-        similar_students = event_feedback[
-            (event_feedback['student_branch'] == student_profile.get('branch', '')) |
-            (event_feedback['student_year'] == student_profile.get('year', 0)) |
-            (event_feedback['skill_level'] == student_profile.get('skill_level', ''))
-        ]
+        return self.get_guidance_batch([(student_profile, event_name)])[0]
+    
+    def get_guidance_batch(self, requests):
+        """
+        Provide guidance for many (student_profile, event_name) pairs in one call
         
-        if len(similar_students) == 0:
-            similar_students = event_feedback
+        Requests are grouped by event: the event-level sections are built once per
+        event and shared, and only the profile-specific pieces are computed per student.
         
-        # Analyze feedback
+        Args:
+            requests: list of (student_profile, event_name) tuples
+            
+        Returns:
+            list of guidance dicts, in the same order as requests
+        """
+        by_event = {}
+        for i, (_, event_name) in enumerate(requests):
+            by_event.setdefault(event_name, []).append(i)
+        
+        results = [None] * len(requests)
+        with self._lock:
+            for event_name, indices in by_event.items():
+                agg = self.aggregates.get(event_name)
+                
+                if agg is None or agg.count == 0:
+                    for i in indices:
+                        results[i] = {"error": f"No historical data found for {event_name}"}
+                    continue
+                
+                shared = self._event_guidance(event_name, agg)
+                for i in indices:
+                    results[i] = self._personalize_guidance(shared, agg, requests[i][0])
+        
+        return results
+    
+    def _event_guidance(self, event_name, agg):
+        """Guidance sections that depend only on the event"""
+        average = agg.mean('overall_satisfaction')
         guidance = {
             'event_name': event_name,
-            'event_type': event_feedback.iloc[0]['event_type'],
-            'total_past_attendees': len(event_feedback),
-            'similar_profile_attendees': len(similar_students),
-            'overall_satisfaction': event_feedback['overall_satisfaction'].mean(),
-            'recommendation_rate': event_feedback['would_recommend'].mean() * 100,
+            'event_type': agg.event_type,
+            'total_past_attendees': agg.count,
+            'similar_profile_attendees': agg.count,
+            'overall_satisfaction': average,
+            'recommendation_rate': agg.mean('would_recommend') * 100,
         }
         
         # 1. COMMON ISSUES & WARNINGS
-        guidance['common_issues'] = self._analyze_common_issues(event_feedback)
+        guidance['common_issues'] = self._analyze_common_issues(agg)
         
         # 2. AREAS OF CONCERN (Low ratings)
-        guidance['areas_of_concern'] = self._identify_concerns(event_feedback)
+        guidance['areas_of_concern'] = self._identify_concerns(agg)
         
         # 3. SUCCESS FACTORS (High ratings)
-        guidance['strengths'] = self._identify_strengths(event_feedback)
+        guidance['strengths'] = self._identify_strengths(agg)
         
         # 4. ACTIONABLE RECOMMENDATIONS
-        guidance['recommendations'] = self._generate_recommendations(
-            event_feedback, similar_students, student_profile
-        )
+        guidance['recommendations'] = self._generate_recommendations(agg)
         
         # 5. SUCCESS TIPS from high performers
-        guidance['success_tips'] = self._get_success_tips(event_feedback, student_profile)
+        guidance['success_tips'] = self._get_success_tips(agg)
         
         # 6. WHAT TO EXPECT
-        guidance['expectations'] = self._set_expectations(event_feedback, similar_students)
+        guidance['expectations'] = self._set_expectations(agg, average)
         
         # 7. PREPARATION ADVICE
-        guidance['preparation'] = self._get_preparation_advice(event_feedback, student_profile)
+        guidance['preparation'] = self._get_preparation_advice(agg)
         
         return guidance
     
-    def _analyze_common_issues(self, event_feedback):
-        """Find most common issues faced by past attendees"""
-        all_issues = []
-        for issues_str in event_feedback['issues_faced'].values:
-            if issues_str and str(issues_str) != 'None' and str(issues_str) != 'nan':
-                all_issues.extend([issue.strip() for issue in str(issues_str).split(',')])
+    def _personalize_guidance(self, shared, agg, student_profile):
+        """Fill the profile-specific pieces into a copy of the shared event guidance"""
+        # Get feedback from similar students
+        similar_count, similar_satisfaction = agg.similar_students(student_profile)
         
-        issue_counts = Counter(all_issues)
-        total_attendees = len(event_feedback)
+        if similar_count == 0:
+            similar_count, similar_satisfaction = agg.count, agg.mean('overall_satisfaction')
+        
+        guidance = dict(shared)
+        guidance['similar_profile_attendees'] = similar_count
+        guidance['recommendations'] = shared['recommendations'] + self._profile_recommendations(student_profile)
+        guidance['expectations'] = dict(shared['expectations'], similar_students_satisfaction=similar_satisfaction)
+        return guidance
+    
+    def _analyze_common_issues(self, agg):
+        """Find most common issues faced by past attendees"""
+        total_attendees = agg.count
         
         common_issues = []
-        for issue, count in issue_counts.most_common(5):
+        for issue, count in agg.issue_counts.most_common(5):
             if issue and issue != 'None':
                 percentage = (count / total_attendees) * 100
                 common_issues.append({
@@ -100,7 +347,7 @@ class EventGuidanceSystem:
         
         return common_issues
     
-    def _identify_concerns(self, event_feedback):
+    def _identify_concerns(self, agg):
         """Identify areas with low ratings"""
         rating_columns = {
             'venue_rating': 'Venue Quality',
@@ -115,7 +362,7 @@ class EventGuidanceSystem:
         
         concerns = []
         for col, label in rating_columns.items():
-            avg_rating = event_feedback[col].mean()
+            avg_rating = agg.mean(col)
             if avg_rating < 7.0:
                 concerns.append({
                     'area': label,
@@ -125,7 +372,7 @@ class EventGuidanceSystem:
         
         return sorted(concerns, key=lambda x: x['average_rating'])
     
-    def _identify_strengths(self, event_feedback):
+    def _identify_strengths(self, agg):
         """Identify areas with high ratings"""
         rating_columns = {
             'venue_rating': 'Venue Quality',
@@ -139,7 +386,7 @@ class EventGuidanceSystem:
         
         strengths = []
         for col, label in rating_columns.items():
-            avg_rating = event_feedback[col].mean()
+            avg_rating = agg.mean(col)
             if avg_rating >= 7.5:
                 strengths.append({
                     'area': label,
@@ -148,40 +395,40 @@ class EventGuidanceSystem:
         
         return sorted(strengths, key=lambda x: x['average_rating'], reverse=True)
     
-    def _generate_recommendations(self, event_feedback, similar_students, student_profile):
+    def _generate_recommendations(self, agg):
         """Generate actionable recommendations based on past feedback"""
         recommendations = []
         
         # Based on common issues
-        if event_feedback['organization_rating'].mean() < 7.0:
+        if agg.mean('organization_rating') < 7.0:
             recommendations.append({
                 'category': 'Organization',
                 'advice': 'Past attendees reported coordination issues. Arrive early, keep emergency contacts handy, and be patient with organizers.',
                 'priority': 'High'
             })
         
-        if event_feedback['mentor_support'].mean() < 7.0:
+        if agg.mean('mentor_support') < 7.0:
             recommendations.append({
                 'category': 'Mentorship',
                 'advice': 'Mentor availability was limited. Prepare your questions in advance and try to connect with mentors early.',
                 'priority': 'High'
             })
         
-        if event_feedback['food_quality'].mean() < 6.5:
+        if agg.mean('food_quality') < 6.5:
             recommendations.append({
                 'category': 'Food',
                 'advice': 'Food quality received low ratings. Consider bringing your own snacks and water.',
                 'priority': 'Medium'
             })
         
-        if event_feedback['infrastructure'].mean() < 7.0:
+        if agg.mean('infrastructure') < 7.0:
             recommendations.append({
                 'category': 'Technical Setup',
                 'advice': 'Infrastructure issues were common. Bring backup chargers, power banks, and essential equipment.',
                 'priority': 'High'
             })
         
-        if event_feedback['time_management'].mean() < 7.0:
+        if agg.mean('time_management') < 7.0:
             recommendations.append({
                 'category': 'Time Management',
                 'advice': 'Timing issues were reported. Plan your schedule with buffer time and prioritize tasks.',
@@ -189,18 +436,21 @@ class EventGuidanceSystem:
             })
         
         # Event-specific recommendations
-        event_type = event_feedback.iloc[0]['event_type']
-        
-        if event_type == 'Hackathon':
-            team_stats = event_feedback.groupby('team_size')['overall_satisfaction'].mean()
-            if len(team_stats) > 0:
-                best_team_size = team_stats.idxmax()
+        if agg.event_type == 'Hackathon':
+            best_team_size = agg.best_team_size()
+            if best_team_size is not None:
                 recommendations.append({
                     'category': 'Team Formation',
                     'advice': f'Data shows teams of {best_team_size} members had highest satisfaction. Form your team before the event.',
                     'priority': 'High'
                 })
         
+        return recommendations
+    
+    def _profile_recommendations(self, student_profile):
+        """Recommendations that depend on the student rather than the event"""
+        recommendations = []
+        
         if student_profile.get('skill_level') == 'Beginner':
             recommendations.append({
                 'category': 'Skill Level',
@@ -210,66 +460,59 @@ class EventGuidanceSystem:
         
         return recommendations
     
-    def _get_success_tips(self, event_feedback, student_profile):
+    def _get_success_tips(self, agg):
         """Get tips from successful participants"""
-        # Define successful participants
-        successful = event_feedback[
-            (event_feedback['overall_satisfaction'] >= 8.0) &
-            (event_feedback['would_recommend'] == 1)
-        ]
-        
-        if len(successful) == 0:
+        if agg.success_count == 0:
             return []
         
         tips = []
         
         # Team participation
-        solo_success = len(successful[successful['participated_alone'] == 1]) / len(successful) * 100
+        solo_success = agg.success_solo / agg.success_count * 100
         if solo_success < 20:
             tips.append("Most successful participants came with teams. Teamwork is key!")
         
         # Achievement patterns
-        winners = successful[successful['achievement'].isin(['Won Prize', 'Runner Up'])]
-        if len(winners) > 0:
-            avg_learning = winners['learning_outcome'].mean()
+        if agg.winner_learning[1] > 0:
+            avg_learning = _mean(agg.winner_learning)
             tips.append(f"Prize winners had average learning outcome of {avg_learning:.1f}/10. Focus on learning!")
         
         # Skill level insights
-        skill_success = successful.groupby('skill_level').size()
-        if len(skill_success) > 0:
-            tips.append(f"Successful participants were mostly {skill_success.idxmax()} level. Set realistic expectations.")
+        top_skill = agg.top_success_skill()
+        if top_skill is not None:
+            tips.append(f"Successful participants were mostly {top_skill} level. Set realistic expectations.")
         
         # Content quality correlation
-        if successful['content_quality'].mean() >= 8.0:
+        if _mean(agg.success_columns['content_quality']) >= 8.0:
             tips.append("High content engagement correlates with success. Participate actively in all sessions.")
         
         # Networking
-        if successful['networking_opportunities'].mean() >= 8.0:
+        if _mean(agg.success_columns['networking_opportunities']) >= 8.0:
             tips.append("Successful participants leveraged networking. Don't hesitate to connect with others.")
         
         return tips
     
-    def _set_expectations(self, event_feedback, similar_students):
+    def _set_expectations(self, agg, similar_satisfaction):
         """Set realistic expectations based on past data"""
+        low, high = agg.satisfaction_sketch.range(0.25, 0.75)
+        average = agg.mean('overall_satisfaction')
         expectations = {
             'satisfaction_range': {
-                'min': event_feedback['overall_satisfaction'].quantile(0.25),
-                'max': event_feedback['overall_satisfaction'].quantile(0.75),
-                'average': event_feedback['overall_satisfaction'].mean()
+                'min': low,
+                'max': high,
+                'average': average
             },
-            'likely_outcome': 'Positive' if event_feedback['overall_satisfaction'].mean() >= 7.0 else 'Mixed',
-            'recommendation_likelihood': event_feedback['would_recommend'].mean() * 100
+            'likely_outcome': 'Positive' if average >= 7.0 else 'Mixed',
+            'recommendation_likelihood': agg.mean('would_recommend') * 100,
+            'similar_students_satisfaction': similar_satisfaction
         }
         
-        if len(similar_students) > 0:
-            expectations['similar_students_satisfaction'] = similar_students['overall_satisfaction'].mean()
-        
         return expectations
     
-    def _get_preparation_advice(self, event_feedback, student_profile):
+    def _get_preparation_advice(self, agg):
         """Provide preparation checklist"""
-        event_type = event_feedback.iloc[0]['event_type']
-        duration = event_feedback.iloc[0]['event_duration_days']
+        event_type = agg.event_type
+        duration = agg.duration_days
         
         checklist = []
         
@@ -309,7 +552,7 @@ class EventGuidanceSystem:
                 'description': 'Have 2-3 project ideas ready to pitch'
             })
         
-        if event_feedback['mentor_support'].mean() < 7.0:
+        if agg.mean('mentor_support') < 7.0:
             checklist.append({
                 'item': 'Questions List',
                 'description': 'Write down questions to ask mentors when available'
@@ -0,0 +1,202 @@
+"""
+Event Registry
+Atomic, capacity-checked registration counters for campus events
+"""
+
+import os
+import sqlite3
+import threading
+from campus_store import DEFAULT_DATA_DIR, DATABASE_FILE
+
+
+class EventFullError(Exception):
+    """Raised when an event has reached max_participants"""
+
+
+class EventRegistry:
+    """
+    Registration counts kept in SQLite, one row per event
+
+    A registration is a single conditional UPDATE
+    (registrations = registrations + 1 WHERE registrations < max_participants)
+    inside an IMMEDIATE transaction, so the capacity check and the increment are
+    one atomic step. Concurrent requests, threads or server processes can't lose
+    an update or overshoot max_participants, and a registration writes one row
+    instead of rewriting events.json.
+
+    Counts start from the registrations value in the event catalog the first
+    time an event is seen; after that the registry is the source of truth.
+    """
+
+    def __init__(self, path=os.path.join(DEFAULT_DATA_DIR, DATABASE_FILE)):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._known = {}
+        self._lock = threading.Lock()
+        self._connection().execute("""
+            CREATE TABLE IF NOT EXISTS event_registrations (
+                event_id TEXT PRIMARY KEY,
+                registrations INTEGER NOT NULL DEFAULT 0,
+                max_participants INTEGER
+            )
+        """)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def sync_events(self, events):
+        """
+        Make sure every event in the catalog has a counter row
+
+        New events are seeded with their catalog registrations; a changed
+        max_participants is picked up, existing counts are never overwritten.
+        Events already synced with the same capacity cost nothing.
+        """
+        with self._lock:
+            changed = [
+                (event["id"], event.get("registrations", 0) or 0, event.get("max_participants"))
+                for event in events
+                if self._known.get(event["id"], ()) != event.get("max_participants")
+            ]
+            if not changed:
+                return
+            self._connection().executemany("""
+                INSERT INTO event_registrations (event_id, registrations, max_participants) VALUES (?, ?, ?)
+                ON CONFLICT (event_id) DO UPDATE SET max_participants = excluded.max_participants
+            """, changed)
+            for event_id, _, max_participants in changed:
+                self._known[event_id] = max_participants
+
+    def register(self, event_id):
+        """
+        Atomically take one place in an event
+
+        Returns:
+            The event's registration count including this one
+
+        Raises:
+            KeyError: event has no counter (call sync_events first)
+            EventFullError: max_participants already reached
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute("""
+                UPDATE event_registrations SET registrations = registrations + 1
+                WHERE event_id = ? AND (max_participants IS NULL OR registrations < max_participants)
+            """, (event_id,))
+            row = conn.execute(
+                "SELECT registrations, max_participants FROM event_registrations WHERE event_id = ?", (event_id,)
+            ).fetchone()
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        if row is None:
+            raise KeyError(event_id)
+        if cursor.rowcount == 0:
+            raise EventFullError(f"Event {event_id} is full ({row[1]} participants)")
+        return row[0]
+
+    def version(self):
+        """
+        Changes whenever any count or capacity changes
+
+        Counts only ever go up, so their sum (with the row count and capacities)
+        identifies the registry state without reading every event.
+        """
+        return self._connection().execute(
+            "SELECT COUNT(*), TOTAL(registrations), TOTAL(max_participants) FROM event_registrations"
+        ).fetchone()
+
+    def counts(self):
+        """Current registration count of every event"""
+        rows = self._connection().execute("SELECT event_id, registrations FROM event_registrations").fetchall()
+        return dict(rows)
+
+    def apply_counts(self, events):
+        """Return copies of catalog events with their live registration counts"""
+        counts = self.counts()
+        return [
+            dict(event, registrations=counts[event["id"]]) if event["id"] in counts else event
+            for event in events
+        ]
+
+
+def _register_worker(path, event_id, attempts):
+    """Load-test worker: try to register attempts times, return how many succeeded"""
+    registry = EventRegistry(path)
+    accepted = 0
+    for _ in range(attempts):
+        try:
+            registry.register(event_id)
+            accepted += 1
+        except EventFullError:
+            pass
+    return accepted
+
+
+if __name__ == "__main__":
+    import time
+    import shutil
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+    print("="*80)
+    print("REGISTRATION LOAD TEST: concurrent registrations vs max_participants")
+    print("="*80)
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, DATABASE_FILE)
+    registry = EventRegistry(path)
+    capacity = 500
+    registry.sync_events([
+        {"id": "threads", "registrations": 0, "max_participants": capacity},
+        {"id": "processes", "registrations": 0, "max_participants": capacity},
+        {"id": "unlimited", "registrations": 0, "max_participants": None},
+    ])
+    all_passed = True
+
+    # 64 threads x 40 attempts = 2,560 attempts for 500 places
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=64) as pool:
+        accepted = sum(pool.map(lambda _: _register_worker(path, "threads", 40), range(64)))
+    elapsed = time.time() - start
+    final = registry.counts()["threads"]
+    passed = accepted == capacity and final == capacity
+    all_passed = all_passed and passed
+    print(f"\n64 threads, 2560 attempts: {accepted} accepted, count = {final} "
+          f"({2560 / elapsed:.0f} attempts/s) {'✓' if passed else '✗'}")
+
+    # Separate processes share the database file, like several server workers
+    start = time.time()
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        accepted = sum(pool.map(_register_worker, [path] * 8, ["processes"] * 8, [100] * 8))
+    elapsed = time.time() - start
+    final = registry.counts()["processes"]
+    passed = accepted == capacity and final == capacity
+    all_passed = all_passed and passed
+    print(f"8 processes, 800 attempts : {accepted} accepted, count = {final} "
+          f"({800 / elapsed:.0f} attempts/s) {'✓' if passed else '✗'}")
+
+    # No capacity: every one of the concurrent increments must be counted
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        accepted = sum(pool.map(lambda _: _register_worker(path, "unlimited", 50), range(32)))
+    final = registry.counts()["unlimited"]
+    passed = accepted == 1600 and final == 1600
+    all_passed = all_passed and passed
+    print(f"32 threads, no limit      : {accepted} accepted, count = {final} {'✓' if passed else '✗'}")
+
+    shutil.rmtree(directory)
+    print("\n✅ PASS: counts exact, capacity never exceeded" if all_passed else "\n❌ FAIL: lost or excess registrations")
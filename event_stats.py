@@ -0,0 +1,88 @@
+"""
+Event Statistics
+Per-event summary statistics materialized once and refreshed incrementally
+"""
+
+import threading
+
+# Output key -> dataset column averaged for it
+MEAN_COLUMNS = {
+    'avg_satisfaction': 'overall_satisfaction',
+    'recommendation_rate': 'would_recommend',
+    'avg_organization': 'organization_rating',
+    'avg_content_quality': 'content_quality',
+    'avg_learning_outcome': 'learning_outcome',
+}
+
+
+class _EventEntry:
+    def __init__(self):
+        self.total = 0
+        self.sums = dict.fromkeys(MEAN_COLUMNS.values(), 0.0)
+        self.counts = dict.fromkeys(MEAN_COLUMNS.values(), 0)
+        self.issue_counts = {}
+        # Most frequent raw issues_faced value; ties go to the smallest string like Series.mode()
+        self.top_issue = None
+        self.top_issue_count = 0
+
+    def count_issue(self, issues, count):
+        total = self.issue_counts.get(issues, 0) + count
+        self.issue_counts[issues] = total
+        if total > self.top_issue_count or (total == self.top_issue_count and issues < self.top_issue):
+            self.top_issue, self.top_issue_count = issues, total
+
+
+class EventStatsTable:
+    """
+    Summary statistics for every event, built with one groupby pass
+
+    Lookups return a prebuilt dict. Appended feedback (including rows for new
+    events) only recomputes the events it touches.
+    """
+
+    def __init__(self, df=None):
+        self._entries = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        if df is not None:
+            self.add_batch(df)
+
+    def add_batch(self, batch):
+        """Fold feedback rows into the per-event sums and issue counts"""
+        if len(batch) == 0:
+            return
+        columns = list(MEAN_COLUMNS.values())
+        grouped = batch.groupby('event_name')
+        sums, counts, sizes = grouped[columns].sum(), grouped[columns].count(), grouped.size()
+        issues = batch.groupby(['event_name', 'issues_faced']).size()
+
+        with self._lock:
+            for event_name in sums.index:
+                entry = self._entries.get(event_name)
+                if entry is None:
+                    entry = self._entries[event_name] = _EventEntry()
+                entry.total += int(sizes[event_name])
+                for col in columns:
+                    entry.sums[col] += sums.at[event_name, col]
+                    entry.counts[col] += int(counts.at[event_name, col])
+
+            for (event_name, issue), count in issues.items():
+                self._entries[event_name].count_issue(issue, int(count))
+
+            for event_name in sums.index:
+                self._stats[event_name] = self._summarize(event_name, self._entries[event_name])
+
+    def _summarize(self, event_name, entry):
+        stats = {'event_name': event_name, 'total_feedback': entry.total}
+        for key, col in MEAN_COLUMNS.items():
+            stats[key] = entry.sums[col] / entry.counts[col] if entry.counts[col] else float('nan')
+        stats['common_issues'] = entry.top_issue if entry.top_issue is not None else 'None'
+        return stats
+
+    def get(self, event_name):
+        """Statistics for one event, or None when it has no feedback"""
+        stats = self._stats.get(event_name)
+        return dict(stats) if stats is not None else None
+
+    def event_names(self):
+        return list(self._stats.keys())
@@ -0,0 +1,204 @@
+"""
+Feedback Store
+Process-wide feedback dataset shared by the recommender, guidance system and API
+"""
+
+import mmap
+import weakref
+import threading
+import numpy as np
+import pandas as pd
+from dataset_cache import DATASET_FILE, load_feedback_dataset
+
+COHORT_COLUMNS = ['student_branch', 'student_year', 'skill_level']
+REQUIRED_COLUMNS = ['event_name', 'event_type', 'event_duration_days', 'overall_satisfaction', 'would_recommend']
+
+# Markers read_csv turns into NaN; appended rows get the same treatment
+MISSING_MARKERS = ['', 'None', 'nan', 'NaN', 'null']
+
+
+def _is_memory_mapped(values):
+    """Follow the .base chain to see whether an array is backed by a file mapping"""
+    base = values
+    while base is not None:
+        if isinstance(base, (np.memmap, mmap.mmap)):
+            return True
+        base = getattr(base, 'base', None)
+    return False
+
+
+class FeedbackStore:
+    def __init__(self, csv_path=DATASET_FILE, df=None):
+        """
+        Load the feedback dataset once
+
+        Args:
+            csv_path: dataset to load (ignored when df is given)
+            df: an already loaded DataFrame to wrap instead of reading from disk
+        """
+        self.csv_path = csv_path
+        self._frame = df if df is not None else load_feedback_dataset(csv_path)
+        self._pending = []
+        self._row_count = len(self._frame)
+        self._listeners = []
+        self.listener_errors = 0
+        self._lock = threading.RLock()
+
+    def _parts(self):
+        """
+        The loaded frame and one frame of the rows appended since
+
+        The loaded (memory-mapped) frame is never replaced; appended batches
+        are merged only with each other, in O(rows appended).
+        """
+        with self._lock:
+            if len(self._pending) > 1:
+                self._pending = [pd.concat(self._pending)]
+            return [self._frame] + self._pending
+
+    @property
+    def df(self):
+        """
+        The full dataset, including rows appended since startup
+
+        A new frame is built on every read once rows have been appended, so
+        long-lived consumers should keep aggregates (see subscribe) instead.
+        """
+        parts = self._parts()
+        if len(parts) == 1:
+            return parts[0]
+        return pd.concat(parts, ignore_index=True)
+
+    def __len__(self):
+        return self._row_count
+
+    def subscribe(self, callback):
+        """
+        Register a callback that receives every appended batch as a DataFrame
+
+        Bound methods are held weakly, so short-lived consumers don't pin themselves
+        to the process-wide store. Callbacks run after the store lock is released,
+        so batches from concurrent appends can arrive concurrently or out of order;
+        a callback that raises is reported and doesn't stop the others.
+
+        Returns:
+            The dataset as of registration. Build the consumer's state from it, so
+            every row is seen exactly once: either in it or in a later callback.
+        """
+        if hasattr(callback, '__self__'):
+            ref = weakref.WeakMethod(callback)
+        else:
+            ref = lambda: callback
+        with self._lock:
+            self._listeners.append(ref)
+            return self.df
+
+    def _normalize_batch(self, rows):
+        """Turn one row, a list of rows or a DataFrame into a frame shaped like the dataset"""
+        if isinstance(rows, pd.DataFrame):
+            batch = rows.copy()
+        elif isinstance(rows, dict):
+            batch = pd.DataFrame([rows])
+        else:
+            batch = pd.DataFrame(list(rows))
+
+        missing = [col for col in REQUIRED_COLUMNS if col not in batch.columns]
+        if missing:
+            raise ValueError(f"Feedback rows are missing required columns: {', '.join(missing)}")
+        if batch[REQUIRED_COLUMNS].isna().any().any():
+            raise ValueError(f"Feedback rows need values for: {', '.join(REQUIRED_COLUMNS)}")
+
+        batch = batch.reindex(columns=self._frame.columns)
+        text_columns = []
+        for col in self._frame.columns:
+            dtype = self._frame[col].dtype
+            if dtype.kind in 'iufb':
+                values = pd.to_numeric(batch[col], errors='coerce')
+                if dtype.kind in 'iu':
+                    fractional = values.notna() & (values != np.floor(values))
+                    if fractional.any():
+                        raise ValueError(f"{col} must be a whole number, got {values[fractional].iloc[0]}")
+                # Keep integer columns integer when every value is present
+                batch[col] = values.astype(dtype) if values.notna().all() else values
+            else:
+                text_columns.append(col)
+        batch[text_columns] = batch[text_columns].replace(MISSING_MARKERS, np.nan)
+        return batch
+
+    def append(self, rows):
+        """
+        Append new feedback rows and notify subscribers
+
+        Args:
+            rows: a dict, a list of dicts or a DataFrame with dataset columns
+
+        Returns:
+            The appended batch, indexed by global row position
+        """
+        batch = self._normalize_batch(rows)
+        if len(batch) == 0:
+            return batch
+
+        with self._lock:
+            offset = self._row_count
+            batch.index = pd.RangeIndex(offset, offset + len(batch))
+            self._pending.append(batch)
+            self._row_count += len(batch)
+
+            callbacks = [(ref, ref()) for ref in self._listeners]
+            self._listeners = [ref for ref, callback in callbacks if callback is not None]
+
+        # Outside the lock: the batch is committed, and a failing subscriber mustn't cost the others theirs
+        for _, callback in callbacks:
+            if callback is None:
+                continue
+            try:
+                callback(batch)
+            except Exception as e:
+                self.listener_errors += 1
+                name = getattr(callback, '__qualname__', repr(callback))
+                print(f"⚠️  Warning: Feedback subscriber {name} failed on {len(batch)} rows: {e}")
+
+        return batch
+
+    def iter_batches(self, batch_size=5000):
+        """The dataset as of the call, in row slices of batch_size (views, not copies where possible)"""
+        for part in self._parts():
+            for start in range(0, len(part), batch_size):
+                yield part.iloc[start:start + batch_size]
+
+    def stats(self):
+        """Row counts and memory footprint of the data"""
+        parts = self._parts()
+        total_bytes = mapped_bytes = 0
+        for part in parts:
+            column_bytes = part.memory_usage(index=False, deep=True)
+            total_bytes += int(column_bytes.sum())
+            mapped_bytes += sum(
+                int(column_bytes[col]) for col in part.columns
+                if _is_memory_mapped(part[col].to_numpy())
+            )
+
+        return {
+            'rows': sum(len(part) for part in parts),
+            'columns': len(parts[0].columns),
+            'appended_rows': sum(len(part) for part in parts[1:]),
+            'listener_errors': self.listener_errors,
+            'dataframe_bytes': total_bytes,
+            'memory_mapped_bytes': mapped_bytes,
+            'heap_bytes': total_bytes - mapped_bytes,
+        }
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_feedback_store(csv_path=DATASET_FILE):
+    """Return the process-wide store, loading it on first use"""
+    global _shared_store
+    if _shared_store is None:
+        with _shared_store_lock:
+            if _shared_store is None:
+                _shared_store = FeedbackStore(csv_path)
+    return _shared_store
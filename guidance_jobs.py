@@ -0,0 +1,166 @@
+"""
+Guidance Jobs
+Background computation and storage of post-registration event guidance
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from inference_executor import InferenceExecutor, ExecutorSaturated
+from campus_store import DEFAULT_DATA_DIR, DATABASE_FILE
+
+# A job still pending after this long belongs to a worker that died (e.g. a restarted server)
+JOB_TIMEOUT_SECONDS = 600
+RETENTION_SECONDS = 24 * 3600
+
+
+class GuidanceJobs:
+    """
+    Guidance results computed off the request path, kept in SQLite
+
+    submit() records a pending job and queues the computation on its own
+    InferenceExecutor, so a registration response waits only for one small
+    INSERT. The worker stores the guidance (or the error) in the
+    guidance_jobs table, where any server process can read it with get().
+    Finished jobs older than retention_seconds are purged as new ones arrive.
+    """
+
+    def __init__(self, path=os.path.join(DEFAULT_DATA_DIR, DATABASE_FILE), workers=1, max_queue=256,
+                 retention_seconds=RETENTION_SECONDS):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.retention_seconds = retention_seconds
+        self.executor = InferenceExecutor(max_workers=workers, max_queue=max_queue)
+        self._local = threading.local()
+        self._last_purge = 0
+        self._connection().execute("""
+            CREATE TABLE IF NOT EXISTS guidance_jobs (
+                id TEXT PRIMARY KEY,
+                event_id TEXT,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                finished_at REAL,
+                result TEXT,
+                error TEXT
+            )
+        """)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit: every statement here is a single-row write
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def submit(self, job_id, event_id, compute):
+        """
+        Queue compute() and record the job as pending
+
+        Returns:
+            'pending', or 'failed' when the queue is full (the job is stored as failed)
+        """
+        conn = self._connection()
+        now = time.time()
+        conn.execute(
+            "INSERT INTO guidance_jobs (id, event_id, status, created_at) VALUES (?, ?, 'pending', ?)",
+            (job_id, event_id, now)
+        )
+        try:
+            self.executor.submit(self._run, job_id, compute)
+        except ExecutorSaturated as e:
+            self._finish(job_id, 'failed', error=str(e))
+            return 'failed'
+        if now - self._last_purge > 60:
+            self._last_purge = now
+            self.purge()
+        return 'pending'
+
+    def _run(self, job_id, compute):
+        try:
+            result = compute()
+        except Exception as e:
+            self._finish(job_id, 'failed', error=str(e))
+        else:
+            self._finish(job_id, 'done', result=result)
+
+    def _finish(self, job_id, status, result=None, error=None):
+        self._connection().execute(
+            "UPDATE guidance_jobs SET status = ?, finished_at = ?, result = ?, error = ? WHERE id = ?",
+            (status, time.time(), json.dumps(result, default=str) if result is not None else None, error, job_id)
+        )
+
+    def get(self, job_id):
+        """Job status and guidance, or None for an unknown (or purged) job"""
+        row = self._connection().execute(
+            "SELECT event_id, status, created_at, finished_at, result, error FROM guidance_jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        event_id, status, created_at, finished_at, result, error = row
+        if status == 'pending' and time.time() - created_at > JOB_TIMEOUT_SECONDS:
+            status, error = 'failed', "Guidance job did not finish"
+        return {
+            "id": job_id,
+            "event_id": event_id,
+            "status": status,
+            "created_at": created_at,
+            "finished_at": finished_at,
+            "guidance": json.loads(result) if result is not None else None,
+            "error": error,
+        }
+
+    def purge(self):
+        """Delete jobs older than the retention period; returns how many"""
+        cursor = self._connection().execute(
+            "DELETE FROM guidance_jobs WHERE created_at < ?", (time.time() - self.retention_seconds,)
+        )
+        return cursor.rowcount
+
+    def stats(self):
+        rows = self._connection().execute("SELECT status, COUNT(*) FROM guidance_jobs GROUP BY status").fetchall()
+        return {"jobs": dict(rows), "executor": self.executor.stats()}
+
+
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    print("="*80)
+    print("REGISTRATION LATENCY: inline guidance vs background job")
+    print("="*80)
+
+    def slow_guidance():
+        # Stand-in for the pandas work behind get_recommendations_for_registered_event
+        time.sleep(0.05)
+        return {"tips": ["Form a team early"]}
+
+    directory = tempfile.mkdtemp()
+    jobs = GuidanceJobs(os.path.join(directory, DATABASE_FILE), workers=2)
+
+    for mode in ("inline", "background"):
+        latencies = []
+        for i in range(100):
+            start = time.perf_counter()
+            if mode == "inline":
+                slow_guidance()
+            else:
+                jobs.submit(f"{mode}{i}", "evt1", slow_guidance)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        print(f"\n{mode:10s} p50 {latencies[50]:6.2f} ms   p99 {latencies[98]:6.2f} ms")
+
+    deadline = time.time() + 30
+    while jobs.get("background99")["status"] == "pending" and time.time() < deadline:
+        time.sleep(0.05)
+    job = jobs.get("background99")
+    print(f"Last background job: {job['status']} {job['guidance']} {'✓' if job['status'] == 'done' else '✗'}")
+    print(f"Stats: {jobs.stats()}")
+    shutil.rmtree(directory)
@@ -0,0 +1,82 @@
+"""
+Inference Executor
+Dedicated, size-bounded worker pool for CPU-heavy ML work with queue-depth backpressure
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExecutorSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+
+class InferenceExecutor:
+    def __init__(self, max_workers=2, max_queue=32):
+        """
+        Args:
+            max_workers: threads running ML work concurrently
+            max_queue: extra jobs allowed to wait for a free worker before rejecting
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ml-inference')
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _run(self, fn):
+        try:
+            return fn()
+        finally:
+            # Released when the work really finishes, even if the caller stopped waiting
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+            self._slots.release()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queue work without blocking
+
+        Returns:
+            concurrent.futures.Future
+
+        Raises:
+            ExecutorSaturated: when max_workers + max_queue jobs are already admitted
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise ExecutorSaturated(f"{self.max_workers + self.max_queue} ML jobs already queued")
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._executor.submit(self._run, functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+            raise
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn on the pool and await its result from the event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'in_flight': self._in_flight,
+                'queued': max(0, self._in_flight - self.max_workers),
+                'completed': self._completed,
+                'rejected': self._rejected,
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,428 @@
+"""
+Inference Pool
+Process-pool model inference with forest arrays in shared memory and zero-copy feature buffers
+"""
+
+import os
+import queue
+import collections
+import atexit
+import threading
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, wait
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor, ExtraTreesClassifier, ExtraTreesRegressor
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+# Models whose prediction is the plain average of their trees' leaf values. Boosted
+# ensembles (GradientBoosting, AdaBoost, HistGradientBoosting) also hold trees in
+# estimators_, but combine them with weights and link functions, so they are refused.
+FLATTENABLE_MODELS = (
+    RandomForestClassifier, ExtraTreesClassifier, DecisionTreeClassifier,
+    RandomForestRegressor, ExtraTreesRegressor, DecisionTreeRegressor,
+)
+
+
+class FlatForest:
+    """
+    A fitted scikit-learn tree ensemble flattened into flat node arrays
+
+    All trees are concatenated; a row is routed through every tree at once, one
+    level per step, so a prediction is ~max_depth vectorized NumPy operations.
+    Leaves point at themselves, which keeps the traversal branch-free.
+    Results match the sklearn model: features are compared as float32 against
+    float64 thresholds and per-tree outputs are summed in tree order.
+    """
+
+    ARRAYS = ['left', 'right', 'feature', 'threshold', 'value', 'roots']
+
+    def __init__(self, arrays, meta):
+        self.arrays = arrays
+        self.meta = meta
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+        self.classes = np.asarray(meta['classes']) if meta['classes'] is not None else None
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Flatten a RandomForest / ExtraTrees / DecisionTree classifier or regressor"""
+        if not isinstance(model, FLATTENABLE_MODELS):
+            raise ValueError(f"{type(model).__name__} is not a tree ensemble that can be flattened "
+                             f"(supported: {', '.join(cls.__name__ for cls in FLATTENABLE_MODELS)})")
+        trees = getattr(model, 'estimators_', None)
+        if trees is None:
+            trees = [model]
+        trees = list(np.ravel(trees))
+        if not trees or not all(hasattr(tree, 'tree_') for tree in trees):
+            raise ValueError(f"{type(model).__name__} is not fitted")
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError("Only single-output models are supported")
+
+        is_classifier = hasattr(model, 'classes_')
+        left, right, feature, threshold, value, roots = [], [], [], [], [], []
+        offset = 0
+        for estimator in trees:
+            tree = estimator.tree_
+            n = tree.node_count
+            leaf = tree.children_left < 0
+            own = np.arange(offset, offset + n, dtype=np.int32)
+            left.append(np.where(leaf, own, tree.children_left + offset).astype(np.int32))
+            right.append(np.where(leaf, own, tree.children_right + offset).astype(np.int32))
+            feature.append(np.where(leaf, 0, tree.feature).astype(np.int32))
+            threshold.append(tree.threshold.astype(np.float64))
+            node_value = tree.value[:, 0, :]
+            if is_classifier:
+                # Per-tree class probabilities, as DecisionTreeClassifier.predict_proba returns them
+                totals = node_value.sum(axis=1, keepdims=True)
+                totals[totals == 0] = 1.0
+                node_value = node_value / totals
+            value.append(node_value.astype(np.float64))
+            roots.append(offset)
+            offset += n
+
+        arrays = {
+            'left': np.concatenate(left),
+            'right': np.concatenate(right),
+            'feature': np.concatenate(feature),
+            'threshold': np.concatenate(threshold),
+            'value': np.ascontiguousarray(np.concatenate(value)),
+            'roots': np.asarray(roots, dtype=np.int64),
+        }
+        meta = {
+            'classes': model.classes_.tolist() if is_classifier else None,
+            'max_depth': max(tree.tree_.max_depth for tree in trees),
+            'n_features': trees[0].tree_.n_features,
+        }
+        return cls(arrays, meta)
+
+    @property
+    def is_classifier(self):
+        return self.classes is not None
+
+    def _leaf_values(self, X):
+        """Average of the per-tree leaf values, shape (n_rows, n_values)"""
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.meta['max_depth']):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        leaves = self.value[node]
+        total = np.zeros((len(X), self.value.shape[1]))
+        for t in range(leaves.shape[1]):
+            total += leaves[:, t]
+        return total / leaves.shape[1]
+
+    def predict_proba(self, X):
+        return self._leaf_values(X)
+
+    def predict(self, X):
+        values = self._leaf_values(X)
+        if self.is_classifier:
+            return self.classes.take(np.argmax(values, axis=1))
+        return values[:, 0]
+
+    def nbytes(self):
+        return sum(a.nbytes for a in self.arrays.values())
+
+
+def _to_shared_memory(arrays):
+    """Copy named arrays into one new shared memory block; returns (block, layout)"""
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        offset = (offset + 63) // 64 * 64
+        layout[name] = (offset, array.dtype.str, array.shape)
+        offset += array.nbytes
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for name, array in arrays.items():
+        start, dtype, shape = layout[name]
+        np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)[...] = array
+    return block, layout
+
+
+def _attach(name):
+    """
+    Attach to a block created by the parent
+
+    Workers share the parent's resource tracker, which already owns the block,
+    so attaching doesn't change who unlinks it.
+    """
+    return shared_memory.SharedMemory(name=name)
+
+
+def _views(block, layout):
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)
+        for name, (start, dtype, shape) in layout.items()
+    }
+
+
+# Worker-process state, set up once by _init_worker
+_worker_models = {}
+_worker_blocks = {}
+
+
+def _init_worker(model_specs):
+    for model_name, (block_name, layout, meta) in model_specs.items():
+        block = _attach(block_name)
+        _worker_blocks[block_name] = block
+        _worker_models[model_name] = FlatForest(_views(block, layout), meta)
+
+
+def _worker_predict(slot_name, n_rows, n_features):
+    """Score the rows a parent wrote into a shared feature slot"""
+    block = _worker_blocks.get(slot_name)
+    if block is None:
+        block = _worker_blocks[slot_name] = _attach(slot_name)
+    # Zero-copy view of the parent's feature buffer
+    X = np.ndarray((n_rows, n_features), dtype=np.float32, buffer=block.buf)
+
+    results = {}
+    for model_name, model in _worker_models.items():
+        values = model._leaf_values(X)
+        if model.is_classifier:
+            results[model_name] = (model.classes.take(np.argmax(values, axis=1)), values)
+        else:
+            results[model_name] = (values[:, 0], None)
+    return results
+
+
+class InferencePool:
+    """
+    Worker processes that score feature matrices with shared, read-only forests
+
+    Each model is flattened once in the parent and copied into shared memory;
+    workers attach to it, so N workers cost one copy of the model arrays. Feature
+    matrices travel through a fixed set of shared memory slots: the parent writes
+    rows into a free slot and sends only its name, the worker reads the rows in
+    place. Batches larger than one slot are split and scored in parallel.
+    """
+
+    def __init__(self, models, workers=None, slot_rows=1024, slots=None):
+        """
+        Args:
+            models: dict name -> fitted sklearn tree ensemble
+            workers: number of worker processes (default: CPU count)
+            slot_rows: rows per shared feature slot
+            slots: number of feature slots, i.e. chunks in flight (default: 2 per worker)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.slot_rows = slot_rows
+        self._blocks = []
+        self._closed = False
+
+        # Flatten everything before allocating shared memory, so an unsupported model leaks nothing
+        forests = {model_name: FlatForest.from_sklearn(model) for model_name, model in models.items()}
+        model_specs = {}
+        n_features = None
+        for model_name, forest in forests.items():
+            block, layout = _to_shared_memory(forest.arrays)
+            self._blocks.append(block)
+            model_specs[model_name] = (block.name, layout, forest.meta)
+            n_features = forest.meta['n_features']
+        self.n_features = n_features
+        self.model_bytes = sum(block.size for block in self._blocks)
+
+        self._slots = queue.Queue()
+        for _ in range(slots or 2 * self.workers):
+            block = shared_memory.SharedMemory(create=True, size=slot_rows * n_features * 4)
+            self._blocks.append(block)
+            self._slots.put(block)
+
+        # Workers only need NumPy and this module; the models reach them through shared memory
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp.get_context(),
+            initializer=_init_worker,
+            initargs=(model_specs,)
+        )
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def warm_up(self):
+        """Start every worker and attach the models before the first real request"""
+        X = np.zeros((1, self.n_features), dtype=np.float32)
+        pending = collections.deque()
+        try:
+            for _ in range(self.workers):
+                self._submit(X, pending, [])
+            while pending:
+                self._collect(pending, [])
+        finally:
+            self._release(pending)
+
+    def _submit(self, X, pending, chunks):
+        while True:
+            try:
+                slot = self._slots.get(block=not pending)
+                break
+            except queue.Empty:
+                # Collect this call's oldest chunk rather than wait on slots it holds itself
+                self._collect(pending, chunks)
+        np.ndarray(X.shape, dtype=np.float32, buffer=slot.buf)[...] = X
+        try:
+            pending.append((self._executor.submit(_worker_predict, slot.name, len(X), X.shape[1]), slot))
+        except BaseException:
+            self._slots.put(slot)
+            raise
+
+    def _collect(self, pending, chunks):
+        """Wait for the oldest chunk in flight and hand its slot back, failed or not"""
+        future, slot = pending[0]
+        try:
+            chunks.append(future.result())
+        finally:
+            # Only a settled chunk's worker is done reading the slot
+            if future.done():
+                pending.popleft()
+                self._slots.put(slot)
+
+    def _release(self, pending):
+        """Return the slots of uncollected chunks once no worker can still be reading them"""
+        running = [future for future, _ in pending if not future.cancel()]
+        wait(running)
+        for _, slot in pending:
+            self._slots.put(slot)
+        pending.clear()
+
+    def predict(self, X):
+        """
+        Score a feature matrix with every model
+
+        Returns:
+            dict model name -> (predictions, class probabilities or None for regressors)
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected a (rows, {self.n_features}) feature matrix, got {X.shape}")
+
+        pending = collections.deque()
+        chunks = []
+        try:
+            for start in range(0, len(X), self.slot_rows):
+                self._submit(X[start:start + self.slot_rows], pending, chunks)
+            while pending:
+                self._collect(pending, chunks)
+        finally:
+            self._release(pending)
+
+        results = {}
+        for model_name in (chunks[0] if chunks else {}):
+            predictions = np.concatenate([chunk[model_name][0] for chunk in chunks])
+            probas = [chunk[model_name][1] for chunk in chunks]
+            results[model_name] = (predictions, np.concatenate(probas) if probas[0] is not None else None)
+        return results
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'slot_rows': self.slot_rows,
+            'free_slots': self._slots.qsize(),
+            'shared_model_bytes': self.model_bytes,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        for block in self._blocks:
+            block.close()
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+
+
+if __name__ == "__main__":
+    import time
+    import joblib
+    import warnings
+    warnings.filterwarnings('ignore')
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("="*80)
+    print("PROCESS-POOL INFERENCE BENCHMARK")
+    print("="*80)
+
+    recommendation_model = joblib.load('recommendation_model.pkl')
+    satisfaction_model = joblib.load('satisfaction_model.pkl')
+    metadata = joblib.load('model_metadata.pkl')
+
+    # Realistic feature rows: the real dataset, encoded the way train_model.py does
+    from dataset_cache import load_feedback_dataset
+    label_encoders = joblib.load('label_encoders.pkl')
+    df = load_feedback_dataset('event_feedback_dataset.csv').sample(8192, random_state=42)
+    for col, encoder in label_encoders.items():
+        codes = {label: code for code, label in enumerate(encoder.classes_)}
+        df[f'{col}_encoded'] = df[col].map(codes).fillna(0)
+    df['total_experience_score'] = df[['venue_rating', 'organization_rating', 'content_quality', 'mentor_support']].mean(axis=1)
+    df['facility_score'] = df[['food_quality', 'infrastructure', 'registration_process']].mean(axis=1)
+    df['engagement_score'] = df[['networking_opportunities', 'time_management', 'learning_outcome']].mean(axis=1)
+    X = df[metadata['feature_columns']].fillna(0).to_numpy(dtype=np.float32)
+
+    # Correctness against the sklearn models
+    check = X[:512]
+    forest = FlatForest.from_sklearn(recommendation_model)
+    proba_error = np.abs(forest.predict_proba(check) - recommendation_model.predict_proba(check)).max()
+    label_match = (forest.predict(check) == recommendation_model.predict(check)).all()
+    regressor = FlatForest.from_sklearn(satisfaction_model)
+    satisfaction_error = np.abs(regressor.predict(check) - satisfaction_model.predict(check)).max()
+    print(f"\nMax |proba - sklearn|: {proba_error:.2e}   labels equal: {label_match}   "
+          f"max |satisfaction - sklearn|: {satisfaction_error:.2e}")
+    print(f"Flattened model arrays (shared once): {(forest.nbytes() + regressor.nbytes()) / 1e6:.1f} MB")
+
+    # Boosted models are refused, and the recommender keeps scoring them in-process with sklearn
+    from sklearn.ensemble import GradientBoostingClassifier, AdaBoostClassifier
+    from recommendation_system import EventRecommendationSystem
+    labels = recommendation_model.predict(check)
+    recommender = EventRecommendationSystem()
+    rows = [dict(zip(metadata['feature_columns'], row)) for row in check.astype(float)]
+    for boosted in (GradientBoostingClassifier(n_estimators=20, random_state=0),
+                    AdaBoostClassifier(n_estimators=20, random_state=0)):
+        boosted.fit(check, labels)
+        recommender.recommendation_model = boosted
+        try:
+            recommender.enable_process_pool(1)
+            print(f"{type(boosted).__name__}: ✗ accepted by the pool")
+            recommender.inference_pool.close()
+            recommender.inference_pool = None
+            continue
+        except ValueError:
+            pass
+        confidence = np.array([r['confidence'] for r in recommender._score_rows(rows)])
+        error = np.abs(confidence - boosted.predict_proba(check)[:, 1]).max()
+        print(f"{type(boosted).__name__}: refused by the pool, in-process max |proba - sklearn| "
+              f"{error:.2e} {'✓' if error == 0 else '✗'}")
+
+    request_rows = 64
+    requests = [X[i:i + request_rows] for i in range(0, len(X), request_rows)]
+
+    def sklearn_score(rows):
+        return (recommendation_model.predict_proba(rows), satisfaction_model.predict(rows))
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=4) as threads:
+        list(threads.map(sklearn_score, requests))
+    elapsed = time.time() - start
+    print(f"\nCPUs available: {os.cpu_count()}")
+    print(f"\n{'backend':28s} {'rows/s':>10s}")
+    print("-"*80)
+    print(f"{'sklearn in-process':28s} {len(X) / elapsed:10.0f}")
+
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    for workers in worker_counts:
+        pool = InferencePool(
+            {'recommendation': recommendation_model, 'satisfaction': satisfaction_model},
+            workers=workers, slot_rows=request_rows
+        )
+        pool.warm_up()
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=2 * workers) as threads:
+            list(threads.map(pool.predict, requests))
+        elapsed = time.time() - start
+        print(f"{'process pool, ' + str(workers) + ' worker(s)':28s} {len(X) / elapsed:10.0f}")
+        pool.close()
@@ -4,10 +4,11 @@ import numpy as np
 from collections import Counter
 import time
 import sys
+from dataset_cache import load_feedback_dataset
 
 # Load dataset at startup
 print("Loading Event Guidance System...")
-df = pd.read_csv('event_feedback_dataset.csv')
+df = load_feedback_dataset('event_feedback_dataset.csv')
 print(f"✓ Loaded {len(df):,} student feedback records\n")
 
 def analyze_event_with_animation(event_name, student_branch="CSE", student_year=2, skill_level="Intermediate"):
@@ -0,0 +1,171 @@
+"""
+Micro Batcher
+Coalesces concurrent async requests into one vectorized call
+"""
+
+import asyncio
+
+
+class MicroBatcher:
+    """
+    Collects submitted items for up to max_wait_ms (or until max_batch_size items
+    are waiting), hands the whole batch to process_batch in one call and resolves
+    each caller's future with its own result.
+
+    process_batch receives a list of items and must return a list of results in
+    the same order; a result that is an Exception instance is raised to that
+    caller only. If process_batch itself raises, every caller in the batch gets
+    the error.
+    """
+
+    def __init__(self, process_batch, max_batch_size=64, max_wait_ms=5, run=None):
+        """
+        Args:
+            process_batch: callable(list of items) -> list of results
+            max_batch_size: dispatch as soon as this many items are waiting
+            max_wait_ms: longest time the first item of a batch waits for company
+            run: optional coroutine function run(fn, items) used to execute
+                 process_batch off the event loop (e.g. InferenceExecutor.run)
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._run = run
+        self._loop = None
+        self._queue = None
+        self._collector = None
+        self._inflight = set()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        # Queues belong to one event loop; restart the collector if the loop changed
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._collector = loop.create_task(self._collect())
+        return loop
+
+    async def submit(self, item):
+        """Queue one item and wait for its result"""
+        loop = self._ensure_started()
+        future = loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Dispatch without waiting so the next batch can fill while this one runs
+            task = loop.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch):
+        # Callers that gave up (e.g. disconnected) are dropped before the model call
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if not batch:
+            return
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+        items = [item for item, _ in batch]
+        try:
+            if self._run is not None:
+                results = await self._run(self.process_batch, items)
+            else:
+                results = self.process_batch(items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'batches': self.batches,
+            'items': self.items,
+            'largest_batch': self.largest_batch,
+            'avg_batch_size': self.items / self.batches if self.batches else 0.0,
+        }
+
+
+if __name__ == "__main__":
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from recommendation_system import EventRecommendationSystem
+
+    print("="*80)
+    print("MICRO-BATCHING BENCHMARK: concurrent recommend-events requests")
+    print("="*80)
+
+    recommender = EventRecommendationSystem()
+    events = [
+        {'name': 'Hacksetu', 'type': 'Hackathon', 'level': 'National', 'duration_days': 2},
+        {'name': 'Anveshan', 'type': 'Hackathon', 'level': 'University', 'duration_days': 1},
+        {'name': 'Ami Chroma', 'type': 'Cultural', 'level': 'University', 'duration_days': 3},
+        {'name': 'Smart India Hackathon', 'type': 'Hackathon', 'level': 'National', 'duration_days': 3},
+        {'name': 'Init Maths', 'type': 'Training', 'level': 'Department', 'duration_days': 6},
+        {'name': 'Convocation', 'type': 'Ceremony', 'level': 'University', 'duration_days': 1},
+        {'name': 'Tech Fest', 'type': 'Technical', 'level': 'University', 'duration_days': 2},
+        {'name': 'Code Sprint', 'type': 'Hackathon', 'level': 'Department', 'duration_days': 1},
+    ]
+    student = {'branch': 'CSE', 'year': 2, 'gender': 'Male', 'skill_level': 'Intermediate'}
+    concurrency = 256
+    pool = ThreadPoolExecutor(max_workers=2)
+
+    async def unbatched():
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(pool, recommender.recommend_events_for_student, student, events)
+            for _ in range(concurrency)
+        ])
+
+    async def batched(max_batch_size):
+        async def run(fn, items):
+            return await asyncio.get_running_loop().run_in_executor(pool, fn, items)
+        batcher = MicroBatcher(recommender.recommend_events_for_students, max_batch_size, run=run)
+        await asyncio.gather(*[batcher.submit((student, events, None, 5)) for _ in range(concurrency)])
+        return batcher
+
+    start = time.time()
+    asyncio.run(unbatched())
+    elapsed = time.time() - start
+    print(f"\n{'mode':22s} {'requests/s':>12s} {'avg batch':>10s}")
+    print("-"*80)
+    print(f"{'one call per request':22s} {concurrency / elapsed:12.1f} {1:10.1f}")
+
+    for max_batch_size in [8, 32, 128]:
+        start = time.time()
+        batcher = asyncio.run(batched(max_batch_size))
+        elapsed = time.time() - start
+        print(f"{'batch <= ' + str(max_batch_size):22s} {concurrency / elapsed:12.1f} "
+              f"{batcher.stats()['avg_batch_size']:10.1f}")
+
+    pool.shutdown()
@@ -8,10 +8,11 @@ import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import time
+from dataset_cache import load_feedback_dataset
 
 # Load and prepare model
 print("Loading ML Model Dashboard...")
-df = pd.read_csv('event_feedback_dataset.csv')
+df = load_feedback_dataset('event_feedback_dataset.csv')
 
 # Prepare features
 le_event = LabelEncoder()
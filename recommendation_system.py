@@ -14,34 +14,40 @@ class EventRecommendationSystem:
         self.label_encoders = joblib.load('label_encoders.pkl')
         self.metadata = joblib.load('model_metadata.pkl')
         self.feature_columns = self.metadata['feature_columns']
+        self._label_codes = {}
+        self.inference_pool = None
         print(f"✓ Models loaded successfully!")
         print(f"✓ Best Model: {self.metadata['best_model_name']}")
         print(f"✓ Accuracy: {self.metadata['accuracy']*100:.2f}%\n")
         
-    def prepare_input(self, student_profile, event_info, past_feedback=None):
-        """
-        Prepare input features from student profile and event information
-        
-        Args:
-            student_profile: dict with keys like branch, year, age, gender, skill_level, etc.
-            event_info: dict with event details like name, type, level, duration, etc.
-            past_feedback: dict with optional past ratings (if available)
-        """
+    def _encode(self, column, value):
+        """Label-encode one value via a cached label -> code map (same codes as LabelEncoder.transform)"""
+        codes = self._label_codes.get(column)
+        if codes is None:
+            codes = {label: code for code, label in enumerate(self.label_encoders[column].classes_)}
+            self._label_codes[column] = codes
+        try:
+            return codes[value]
+        except KeyError:
+            raise ValueError(f"y contains previously unseen labels: '{value}'") from None
+    
+    def _feature_row(self, student_profile, event_info, past_feedback=None):
+        """Build the feature dict for one (student, event) pair"""
         # Default values
         input_data = {
-            'event_name_encoded': self.label_encoders['event_name'].transform([event_info['name']])[0],
-            'event_type_encoded': self.label_encoders['event_type'].transform([event_info['type']])[0],
-            'event_level_encoded': self.label_encoders['event_level'].transform([event_info['level']])[0],
+            'event_name_encoded': self._encode('event_name', event_info['name']),
+            'event_type_encoded': self._encode('event_type', event_info['type']),
+            'event_level_encoded': self._encode('event_level', event_info['level']),
             'event_duration_days': event_info['duration_days'],
-            'student_branch_encoded': self.label_encoders['student_branch'].transform([student_profile['branch']])[0],
+            'student_branch_encoded': self._encode('student_branch', student_profile['branch']),
             'student_year': student_profile['year'],
             'student_age': student_profile.get('age', 18 + student_profile['year']),
-            'gender_encoded': self.label_encoders['gender'].transform([student_profile['gender']])[0],
-            'previous_participation_encoded': self.label_encoders['previous_participation'].transform([student_profile.get('previous_participation', 'Low')])[0],
-            'skill_level_encoded': self.label_encoders['skill_level'].transform([student_profile['skill_level']])[0],
+            'gender_encoded': self._encode('gender', student_profile['gender']),
+            'previous_participation_encoded': self._encode('previous_participation', student_profile.get('previous_participation', 'Low')),
+            'skill_level_encoded': self._encode('skill_level', student_profile['skill_level']),
             'team_size': student_profile.get('team_size', 3),
             'participated_alone': student_profile.get('participated_alone', 0),
-            'achievement_encoded': self.label_encoders['achievement'].transform([student_profile.get('achievement', 'Participation')])[0],
+            'achievement_encoded': self._encode('achievement', student_profile.get('achievement', 'Participation')),
         }
         
         # Use past feedback if available, otherwise use estimated values
@@ -94,14 +100,70 @@ class EventRecommendationSystem:
         
         # Sentiment and feedback
         sentiment = 'Positive' if input_data['total_experience_score'] >= 7 else 'Neutral'
-        input_data['sentiment_encoded'] = self.label_encoders['sentiment'].transform([sentiment])[0]
+        input_data['sentiment_encoded'] = self._encode('sentiment', sentiment)
         input_data['feedback_length'] = 150
         input_data['suggestions_given'] = 1
+        return input_data
+    
+    def prepare_input(self, student_profile, event_info, past_feedback=None):
+        """
+        Prepare input features from student profile and event information
         
+        Args:
+            student_profile: dict with keys like branch, year, age, gender, skill_level, etc.
+            event_info: dict with event details like name, type, level, duration, etc.
+            past_feedback: dict with optional past ratings (if available)
+        """
         # Create DataFrame with correct column order
-        input_df = pd.DataFrame([input_data])[self.feature_columns]
+        input_df = pd.DataFrame([self._feature_row(student_profile, event_info, past_feedback)])[self.feature_columns]
         return input_df
     
+    def enable_process_pool(self, workers=None):
+        """
+        Score on worker processes that share the model arrays (see inference_pool.py)
+        
+        Raises:
+            ValueError: if the trained models aren't tree ensembles the pool can flatten
+        """
+        from inference_pool import InferencePool
+        pool = InferencePool(
+            {'recommendation': self.recommendation_model, 'satisfaction': self.satisfaction_model},
+            workers=workers
+        )
+        pool.warm_up()
+        self.inference_pool = pool
+        return pool
+    
+    def _score_rows(self, rows):
+        """One model call per model for a list of feature dicts"""
+        input_features = pd.DataFrame(rows)[self.feature_columns]
+        
+        if self.inference_pool is not None:
+            results = self.inference_pool.predict(input_features.to_numpy(dtype=np.float32))
+            recommendation, probability = results['recommendation'][0], results['recommendation'][1][:, 1]
+            satisfaction = results['satisfaction'][0]
+        else:
+            recommendation = self.recommendation_model.predict(input_features)
+            
+            if hasattr(self.recommendation_model, 'predict_proba'):
+                probability = self.recommendation_model.predict_proba(input_features)[:, 1]
+            else:
+                probability = recommendation
+            
+            satisfaction = self.satisfaction_model.predict(input_features)
+        
+        return [
+            {
+                'would_recommend': bool(rec),
+                'confidence': float(prob),
+                'predicted_satisfaction': float(sat),
+                'recommendation_text': "Highly Recommended" if prob > 0.75 else 
+                                       "Recommended" if rec else 
+                                       "Not Recommended"
+            }
+            for rec, prob, sat in zip(recommendation, probability, satisfaction)
+        ]
+    
     def predict_recommendation(self, student_profile, event_info, past_feedback=None):
         """
         Predict if a student would recommend the event
@@ -111,27 +173,26 @@ class EventRecommendationSystem:
             - probability: confidence score
             - satisfaction: predicted satisfaction score
         """
-        input_features = self.prepare_input(student_profile, event_info, past_feedback)
-        
-        # Predict recommendation
-        recommendation = self.recommendation_model.predict(input_features)[0]
+        return self._score_rows([self._feature_row(student_profile, event_info, past_feedback)])[0]
+    
+    @staticmethod
+    def _rank_events(available_events, predictions, top_n):
+        recommendations = []
         
-        if hasattr(self.recommendation_model, 'predict_proba'):
-            probability = self.recommendation_model.predict_proba(input_features)[0][1]
-        else:
-            probability = recommendation
+        for event, prediction in zip(available_events, predictions):
+            recommendations.append({
+                'event_name': event['name'],
+                'event_type': event['type'],
+                'confidence': prediction['confidence'],
+                'predicted_satisfaction': prediction['predicted_satisfaction'],
+                'recommendation': prediction['recommendation_text'],
+                'would_recommend': prediction['would_recommend']
+            })
         
-        # Predict satisfaction
-        satisfaction = self.satisfaction_model.predict(input_features)[0]
+        # Sort by confidence and satisfaction
+        recommendations.sort(key=lambda x: (x['confidence'], x['predicted_satisfaction']), reverse=True)
         
-        return {
-            'would_recommend': bool(recommendation),
-            'confidence': float(probability),
-            'predicted_satisfaction': float(satisfaction),
-            'recommendation_text': "Highly Recommended" if probability > 0.75 else 
-                                   "Recommended" if recommendation else 
-                                   "Not Recommended"
-        }
+        return recommendations[:top_n]
     
     def recommend_events_for_student(self, student_profile, available_events, past_feedback=None, top_n=5):
         """
@@ -146,23 +207,38 @@ class EventRecommendationSystem:
         Returns:
             List of recommended events with scores
         """
-        recommendations = []
+        rows = [self._feature_row(student_profile, event, past_feedback) for event in available_events]
+        predictions = self._score_rows(rows) if rows else []
+        return self._rank_events(available_events, predictions, top_n)
+    
+    def recommend_events_for_students(self, requests):
+        """
+        Recommend events for many students with a single model call
         
-        for event in available_events:
-            prediction = self.predict_recommendation(student_profile, event, past_feedback)
-            recommendations.append({
-                'event_name': event['name'],
-                'event_type': event['type'],
-                'confidence': prediction['confidence'],
-                'predicted_satisfaction': prediction['predicted_satisfaction'],
-                'recommendation': prediction['recommendation_text'],
-                'would_recommend': prediction['would_recommend']
-            })
+        Args:
+            requests: list of (student_profile, available_events, past_feedback, top_n) tuples
         
-        # Sort by confidence and satisfaction
-        recommendations.sort(key=lambda x: (x['confidence'], x['predicted_satisfaction']), reverse=True)
+        Returns:
+            One entry per request: its recommendation list, or the exception raised
+            while preparing its features (e.g. an unknown label), so one bad
+            request doesn't fail the others
+        """
+        results = [None] * len(requests)
+        rows, spans = [], []
+        for i, (student_profile, available_events, past_feedback, _) in enumerate(requests):
+            try:
+                request_rows = [self._feature_row(student_profile, event, past_feedback) for event in available_events]
+            except Exception as e:
+                results[i] = e
+                continue
+            spans.append((i, len(rows), len(rows) + len(request_rows)))
+            rows.extend(request_rows)
         
-        return recommendations[:top_n]
+        predictions = self._score_rows(rows) if rows else []
+        for i, start, end in spans:
+            _, available_events, _, top_n = requests[i]
+            results[i] = self._rank_events(available_events, predictions[start:end], top_n)
+        return results
     
     def get_insights_from_past_events(self, past_events_feedback):
         """
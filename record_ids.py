@@ -0,0 +1,205 @@
+"""
+Record IDs
+Time-ordered, collision-free IDs for campus records (Snowflake layout, base32 text)
+"""
+
+import os
+import time
+import threading
+from campus_store import DEFAULT_DATA_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# 42 bits of milliseconds since EPOCH_MS (~139 years), 10 bits of worker id, 12 bits of sequence
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+# Bit 64 is always set, so the text starts with G-Z and every new ID sorts after the
+# older prefix + decimal millisecond IDs (e.g. p1707480000000)
+MARKER = 1 << 64
+
+# Crockford base32: digits sort before letters in ASCII, so text order is numeric order
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+ID_LENGTH = 13  # 13 x 5 bits covers 64 plus MARKER
+# Lock files through which processes sharing a data directory lease distinct worker ids
+WORKER_ID_DIR = os.path.join(DEFAULT_DATA_DIR, "worker_ids")
+
+
+def _encode(value):
+    chars = []
+    for _ in range(ID_LENGTH):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+# worker id -> (pid, open lock file) for the ids this process leased
+_leases = {}
+
+
+def _try_lock(f):
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def claim_worker_id(directory=WORKER_ID_DIR, worker_id=None):
+    """
+    Lease worker_id, or else the lowest worker id no other live process holds
+
+    Each id is an exclusive lock on {directory}/{id}.lock, held until the
+    process exits (the OS drops it even after a crash), so every server
+    process sharing the data directory gets its own id without configuration,
+    and a configured id can't be used by two processes at once.
+
+    Raises:
+        RuntimeError: worker_id (or, without one, every id) is leased by another process
+    """
+    if worker_id is not None and not 0 <= worker_id <= MAX_WORKER_ID:
+        raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+    os.makedirs(directory, exist_ok=True)
+    for candidate in range(MAX_WORKER_ID + 1) if worker_id is None else [worker_id]:
+        lease = _leases.get(candidate)
+        if worker_id is not None and lease is not None and lease[0] == os.getpid():
+            return candidate
+        f = open(os.path.join(directory, f"{candidate}.lock"), 'a+')
+        if _try_lock(f):
+            _leases[candidate] = (os.getpid(), f)
+            return candidate
+        f.close()
+    if worker_id is not None:
+        raise RuntimeError(f"Worker id {worker_id} is already leased by another process ({directory})")
+    raise RuntimeError(f"All {MAX_WORKER_ID + 1} worker ids in {directory} are leased")
+
+
+def default_worker_id():
+    """WORKER_ID, else the shard worker index (CAMPUS_WORKER_INDEX), else the lowest free id; always leased"""
+    for name in ("WORKER_ID", "CAMPUS_WORKER_INDEX"):
+        if os.environ.get(name):
+            return claim_worker_id(worker_id=int(os.environ[name]))
+    return claim_worker_id()
+
+
+class IdGenerator:
+    """
+    Unique, sortable IDs: millisecond timestamp, worker id, per-millisecond sequence
+
+    IDs from one generator strictly increase. Up to 4096 IDs can be made per
+    millisecond; past that, or if the clock steps backwards, the generator
+    runs ahead on its own last timestamp instead of waiting or repeating. Two
+    processes only collide if they share a worker id; by default each process
+    leases its own (see default_worker_id).
+    """
+
+    def __init__(self, worker_id=None):
+        if worker_id is None:
+            worker_id = default_worker_id()
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+        self.worker_id = worker_id
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._sequence = 0
+
+    def next_value(self):
+        now = int(time.time() * 1000) - EPOCH_MS
+        with self._lock:
+            if now > self._last_ms:
+                self._last_ms = now
+                self._sequence = 0
+            elif self._sequence < MAX_SEQUENCE:
+                self._sequence += 1
+            else:
+                self._last_ms += 1
+                self._sequence = 0
+            return (MARKER | (self._last_ms << (WORKER_BITS + SEQUENCE_BITS))
+                    | (self.worker_id << SEQUENCE_BITS) | self._sequence)
+
+    def new_id(self, prefix=""):
+        """prefix + 13 base32 characters, e.g. new_id('p') -> 'pG1HV6Z...'"""
+        return prefix + _encode(self.next_value())
+
+
+_default_generator = None
+_default_generator_pid = None
+_default_generator_lock = threading.Lock()
+
+
+def new_id(prefix=""):
+    """ID from the process-wide generator"""
+    global _default_generator, _default_generator_pid
+    # A forked child inherits the parent's generator and lease, so it makes its own
+    if _default_generator is None or _default_generator_pid != os.getpid():
+        with _default_generator_lock:
+            if _default_generator is None or _default_generator_pid != os.getpid():
+                _default_generator = IdGenerator()
+                _default_generator_pid = os.getpid()
+    return _default_generator.new_id(prefix)
+
+
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+    import subprocess
+    import sys
+    from datetime import datetime
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("="*80)
+    print("ID GENERATOR CHECK: uniqueness, order and throughput")
+    print("="*80)
+
+    old_style = [f"p{int(datetime.now().timestamp() * 1000)}" for _ in range(10000)]
+    print(f"\nTimestamp IDs: {len(set(old_style))} distinct out of 10000 made in a tight loop")
+    after = IdGenerator(worker_id=1).new_id("p") > max(old_style)
+    print(f"New IDs sort after timestamp IDs: {'✓' if after else '✗'}")
+
+    generator = IdGenerator(worker_id=1)
+    start = time.perf_counter()
+    ids = [generator.new_id("p") for _ in range(100000)]
+    elapsed = time.perf_counter() - start
+    ordered = ids == sorted(ids) and len(set(ids)) == len(ids)
+    print(f"Generator IDs: {len(set(ids))} distinct out of 100000, strictly sorted: {'✓' if ordered else '✗'} "
+          f"({100000 / elapsed:,.0f} IDs/s)")
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        threaded = list(pool.map(lambda _: [generator.new_id("p") for _ in range(5000)], range(16)))
+    flat = [i for batch in threaded for i in batch]
+    per_thread_sorted = all(batch == sorted(batch) for batch in threaded)
+    print(f"16 threads x 5000: {len(set(flat))} distinct, each thread's IDs sorted: "
+          f"{'✓' if len(set(flat)) == len(flat) and per_thread_sorted else '✗'}")
+
+    others = [IdGenerator(worker_id=2).new_id("p") for _ in range(1000)]
+    print(f"Two workers never collide: {'✓' if not set(others) & set(ids) else '✗'}")
+
+    # Unconfigured processes sharing a data directory lease distinct worker ids
+    directory = tempfile.mkdtemp()
+    script = f"import time, record_ids; print(record_ids.claim_worker_id({directory!r}), flush=True); time.sleep(2)"
+    env = {k: v for k, v in os.environ.items() if k not in ("WORKER_ID", "CAMPUS_WORKER_INDEX")}
+    workers = [subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, text=True, env=env)
+               for _ in range(4)]
+    leased = sorted(int(w.stdout.readline()) for w in workers)
+    for w in workers:
+        w.wait()
+    print(f"4 processes leased worker ids {leased}: {'✓' if len(set(leased)) == 4 else '✗'}")
+
+    # A configured id is leased too, so a second process configured with it fails to start
+    script = f"import time, record_ids; record_ids.claim_worker_id({directory!r}, 7); print('ok', flush=True); time.sleep(2)"
+    holder = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, text=True, env=env)
+    holder.stdout.readline()
+    second = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=env)
+    holder.wait()
+    refused = second.returncode != 0 and "already leased" in second.stderr
+    print(f"Configured worker id 7 can't be held twice: {'✓' if refused else '✗'}")
+    shutil.rmtree(directory)
@@ -8,6 +8,7 @@ from sklearn.neural_network import MLPClassifier
 import xgboost as xgb
 import joblib
 import warnings
+from dataset_cache import load_feedback_dataset
 warnings.filterwarnings('ignore')
 
 print("="*80)
@@ -16,7 +17,7 @@ print("="*80)
 
 # Load dataset
 print("\n[1/8] Loading dataset...")
-df = pd.read_csv('event_feedback_dataset.csv')
+df = load_feedback_dataset('event_feedback_dataset.csv')
 print(f"Dataset loaded: {df.shape[0]} records, {df.shape[1]} features")
 
 # Feature Engineering